@@ -0,0 +1,268 @@
+import contextlib
+import glob
+import hashlib
+import mmap
+import os
+from collections import OrderedDict
+import struct
+import threading
+import time
+
+import pygame
+
+import bootstrap
+
+# Decoded frame cache file layout: header followed by raw frames, back to back
+# (frames at load resolution, so it saves the GIF decode and RGBA conversion; sizing for the
+# window happens at draw time, see get_scaled_frames)
+CACHE_MAGIC = b'FGIF'
+CACHE_VERSION = 1
+CACHE_HEADER = struct.Struct('<4sIIIII')  # magic, version, frame count, width, height, frame delay
+PIXEL_FORMAT = 'RGBA'
+
+def frame_cache_path(gif_path, scale_factor):
+    """Return the cache file path for a GIF, keyed by source hash, scale factor and pixel format"""
+    with open(gif_path, 'rb') as f:
+        source_hash = hashlib.sha1(f.read()).hexdigest()[:16]
+    return f"{gif_path}.{source_hash}.x{scale_factor:g}.{PIXEL_FORMAT}.frames"
+
+def write_frame_cache(gif_path, cache_path, frames_data, size, frame_delay):
+    """Write decoded frames to the cache file (atomically, stale caches for the GIF are removed)"""
+    temp_path = cache_path + '.tmp'
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, len(frames_data), size[0], size[1], frame_delay))
+            for frame_data in frames_data:
+                f.write(frame_data)
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        print(f"Warning: could not write GIF frame cache: {e}")
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        return
+
+    # Caches for older versions of the GIF or other scale factors are no longer needed
+    # (best effort, a read-only directory or a file still open elsewhere keeps its stale cache)
+    for stale_path in glob.glob(glob.escape(gif_path) + '.*.frames'):
+        if stale_path != cache_path:
+            with contextlib.suppress(OSError):
+                os.remove(stale_path)
+
+def read_frame_cache(cache_path):
+    """Map a cache file and return (mapping, frame views, size, frame delay), or None if unusable"""
+    if not os.path.exists(cache_path):
+        return None
+
+    try:
+        with open(cache_path, 'rb') as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not read GIF frame cache: {e}")
+        return None
+
+    if len(mapping) < CACHE_HEADER.size:
+        mapping.close()
+        return None
+
+    magic, version, frame_count, width, height, frame_delay = CACHE_HEADER.unpack_from(mapping)
+    frame_bytes = width * height * len(PIXEL_FORMAT)
+    if (magic != CACHE_MAGIC or version != CACHE_VERSION
+            or len(mapping) != CACHE_HEADER.size + frame_count * frame_bytes):
+        mapping.close()
+        return None
+
+    # Frames are slices of the mapping, no copies
+    view = memoryview(mapping)
+    frame_views = [
+        view[CACHE_HEADER.size + i * frame_bytes:CACHE_HEADER.size + (i + 1) * frame_bytes]
+        for i in range(frame_count)
+    ]
+    return mapping, frame_views, (width, height), frame_delay
+
+class AnimatedGIF:
+    def __init__(self, gif_path, scale_factor=1.0, use_cache=True, background=False, max_scaled_sizes=3):
+        self.frames = []  # Frames at load resolution (native unless scale_factor is set)
+        self.current_frame = 0
+        self.frame_delay = 0
+        self.last_update_time = 0
+        self.scale_factor = scale_factor
+        self.use_cache = use_cache
+        self.frame_map = None  # Mapped cache file backing the frames
+
+        # Display-ready frames scaled for recent target sizes (LRU keyed by size)
+        self.scaled_frames = OrderedDict()
+        self.max_scaled_sizes = max_scaled_sizes
+
+        # Loading progress and timing (filled in as frames become available)
+        self.total_frames = 0
+        self.loading = False
+        self.load_stats = {}
+        self.loader_thread = None
+
+        if background:
+            self.start_background_load(gif_path)
+        else:
+            self.load_gif(gif_path)
+
+    def start_background_load(self, gif_path):
+        """Decode frames on a worker thread, frames are added to the animation as they finish"""
+        self.loading = True
+        self.loader_thread = threading.Thread(
+            target=self.load_gif, args=(gif_path,), name="gif-loader", daemon=True
+        )
+        self.loader_thread.start()
+
+    def wait(self, timeout=None):
+        """Block until a background load has finished"""
+        if self.loader_thread:
+            self.loader_thread.join(timeout)
+        return not self.loading
+
+    def loading_progress(self):
+        """Return the fraction of frames loaded so far (0.0 to 1.0)"""
+        if not self.total_frames:
+            return 0.0 if self.loading else 1.0
+        return len(self.frames) / self.total_frames
+
+    def load_gif(self, gif_path):
+        """Load frames from a GIF file, using the decoded frame cache when possible"""
+        self.loading = True
+        start_time = time.perf_counter()
+        try:
+            if not os.path.exists(gif_path):
+                print(f"Warning: GIF file not found: {gif_path}")
+                return
+
+            cache_path = frame_cache_path(gif_path, self.scale_factor) if self.use_cache else None
+
+            # Fast path: build surfaces straight from the mapped cache file
+            cached = read_frame_cache(cache_path) if cache_path else None
+            if cached:
+                self.frame_map, frame_views, frame_size, self.frame_delay = cached
+                self.total_frames = len(frame_views)
+                for frame_view in frame_views:
+                    self.add_frame(pygame.image.frombuffer(frame_view, frame_size, PIXEL_FORMAT), start_time)
+                source = "cache"
+            else:
+                frames_data = []
+                frame_size = (0, 0)
+                for frame_data, frame_size in self.decode_gif(gif_path):
+                    frames_data.append(frame_data)
+                    self.add_frame(pygame.image.frombuffer(frame_data, frame_size, PIXEL_FORMAT), start_time)
+                if cache_path and frames_data:
+                    write_frame_cache(gif_path, cache_path, frames_data, frame_size, self.frame_delay)
+                source = "decoded"
+
+            end_time = time.perf_counter()
+            self.load_stats['source'] = source
+            self.load_stats['frames'] = len(self.frames)
+            self.load_stats['total_ms'] = (end_time - start_time) * 1000
+            bootstrap.record("AnimatedGIF.load_gif", start_time, end_time)
+
+            print(
+                f"Successfully loaded GIF with {len(self.frames)} frames ({source}) in "
+                f"{self.load_stats['total_ms']:.1f} ms, first frame after {self.load_stats.get('first_frame_ms', 0):.1f} ms"
+            )
+
+        except Exception as e:
+            print(f"Error loading GIF: {e}")
+        finally:
+            self.loading = False
+
+    def add_frame(self, frame, start_time):
+        """Make a loaded frame available to the animation"""
+        if not self.frames:
+            # Animation starts as soon as the first frame is ready
+            self.load_stats['first_frame_ms'] = (time.perf_counter() - start_time) * 1000
+            self.last_update_time = pygame.time.get_ticks()
+        self.frames.append(frame)
+
+    def decode_gif(self, gif_path):
+        """Decode and scale frames with Pillow, yielding (raw RGBA frame, frame size) as each one finishes"""
+        # Pillow is only needed when the frame cache is missing or stale
+        from PIL import Image, ImageSequence
+        from PIL.Image import Resampling
+
+        # Open the GIF file
+        gif = Image.open(gif_path)
+        self.total_frames = getattr(gif, 'n_frames', 1)
+
+        # Get the frame delay time (in milliseconds)
+        # Default to 100ms if not specified
+        self.frame_delay = gif.info.get('duration', 100)
+
+        # Get all frames
+        for frame in ImageSequence.Iterator(gif):
+            # Convert frame to RGBA mode (for transparency)
+            frame_rgba = frame.convert(PIXEL_FORMAT)
+
+            # Scale the frame if needed
+            if self.scale_factor != 1.0:
+                new_size = (
+                    int(frame_rgba.width * self.scale_factor),
+                    int(frame_rgba.height * self.scale_factor)
+                )
+                frame_rgba = frame_rgba.resize(new_size, Resampling.LANCZOS)
+
+            yield frame_rgba.tobytes(), frame_rgba.size
+
+    def update(self):
+        """Update the animation frame"""
+        if not self.frames:
+            return
+
+        current_time = pygame.time.get_ticks()
+
+        # Check if it's time to advance to the next frame
+        if current_time - self.last_update_time > self.frame_delay:
+            self.current_frame = (self.current_frame + 1) % len(self.frames)
+            self.last_update_time = current_time
+
+    def size_for_height(self, height):
+        """Return the frame size that keeps the aspect ratio at the given height"""
+        width, native_height = self.frames[0].get_size()
+        return (max(1, round(width * height / native_height)), max(1, int(height)))
+
+    def get_scaled_frames(self, size):
+        """Return frames scaled and converted for a target size, reusing sizes built before"""
+        size = tuple(size)
+        scaled = self.scaled_frames.get(size)
+        if scaled is None:
+            scaled = []
+            self.scaled_frames[size] = scaled
+
+            # Keep only the few most recently used sizes in memory
+            if len(self.scaled_frames) > self.max_scaled_sizes:
+                self.scaled_frames.popitem(last=False)
+        else:
+            self.scaled_frames.move_to_end(size)
+
+        # Scale frames that arrived since this size was last used (background loading)
+        for frame in self.frames[len(scaled):]:
+            scaled_frame = frame if frame.get_size() == size else pygame.transform.smoothscale(frame, size)
+            if pygame.display.get_surface() is not None:
+                scaled_frame = scaled_frame.convert_alpha()
+            scaled.append(scaled_frame)
+        return scaled
+
+    def draw(self, surface, position, height=None):
+        """Draw the current frame at the specified position, scaled to the given height if set"""
+        if not self.frames:
+            return
+
+        # Center the frame horizontally
+        if height is None:
+            frame = self.frames[self.current_frame]
+        else:
+            frame = self.get_scaled_frames(self.size_for_height(height))[self.current_frame]
+        x = position[0] - frame.get_width() // 2
+        y = position[1]
+
+        # Draw the frame
+        surface.blit(frame, (x, y))
+
+    def get_size(self):
+        """Get the size of the current frame"""
+        if not self.frames:
+            return (0, 0)
+        return self.frames[self.current_frame].get_size()
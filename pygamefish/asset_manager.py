@@ -0,0 +1,194 @@
+import os
+import shutil
+import time
+from collections import OrderedDict
+
+import pygame
+
+from animated_gif import AnimatedGIF
+import bootstrap
+from fonts import get_font
+
+# Every asset the game knows about. Nothing is touched on disk until an asset is first used.
+# 'volume' is the per-sound multiplier applied on top of the SFX volume setting.
+MANIFEST = {
+    # Sound effects
+    'pop_drip': {'type': 'sound', 'path': 'assets/sounds/pop_drip.wav', 'volume': 0.5},
+    'digi_plink': {'type': 'sound', 'path': 'assets/sounds/digi_plink.wav', 'volume': 0.5},
+    'click_04': {'type': 'sound', 'path': 'assets/sounds/click_04.wav', 'volume': 0.7},  # Slightly louder for button clicks
+    'start_game': {'type': 'sound', 'path': 'assets/sounds/start_game.wav', 'volume': 0.8},  # Slightly louder for game start
+    'fishing': {'type': 'sound', 'path': 'assets/sounds/fishing_sound.mp3', 'volume': 0.7},
+
+    # Music (streamed by the mixer, only the path is tracked)
+    'main_theme': {'type': 'music', 'path': 'assets/music/maintheme.mp3'},
+    'pond': {'type': 'music', 'path': 'assets/music/pond.mp3'},
+    'mystery_lake': {'type': 'music', 'path': 'assets/music/mysterylake.mp3'},
+    'kevin': {'type': 'music', 'path': 'assets/music/kevin.mp3'},
+    'wrong_frequency': {'type': 'music', 'path': 'assets/music/Wrong Frequency Loop.mp3'},
+
+    # Animations (decoded on a worker thread)
+    'main_menu': {'type': 'animation', 'path': 'assets/animations/mainmenu.gif'},
+
+    # Fonts (None = pygame's default font)
+    'default': {'type': 'font', 'path': None},
+}
+
+class AssetManager:
+    """Loads assets from a manifest on first use, with reference counts and bounded-memory eviction"""
+    def __init__(self, manifest, max_bytes=64 * 1024 * 1024):
+        self.manifest = manifest
+        self.max_bytes = max_bytes
+
+        # Loaded assets in least-recently-used order
+        self.loaded = OrderedDict()
+        self.ref_counts = {}
+
+        # Per-asset load time (ms) and load count
+        self.load_times = {}
+        self.load_counts = {}
+
+        # Assets we already warned about, so a missing file only prints once
+        self.missing = set()
+
+        self.sfx_volume = 1.0
+        self.current_music = None
+
+    def resolve_path(self, name):
+        """Return the asset's path, moving a legacy copy from the working directory if needed"""
+        path = self.manifest[name]['path']
+        if path is None or os.path.exists(path):
+            return path
+
+        # Older setups kept assets next to the scripts
+        legacy_path = os.path.basename(path)
+        if os.path.exists(legacy_path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            shutil.move(legacy_path, path)
+            return path
+
+        if name not in self.missing:
+            print(f"Warning: {path} not found. {name} will not be available.")
+            self.missing.add(name)
+        return None
+
+    def get(self, name):
+        """Return a loaded asset, loading it on first use (None if the file is missing)"""
+        if name in self.loaded:
+            self.loaded.move_to_end(name)
+            return self.loaded[name]
+        if name in self.missing:
+            return None
+
+        entry = self.manifest[name]
+        start_time = time.perf_counter()
+
+        if entry['type'] == 'font':
+            asset = entry['path']
+        else:
+            path = self.resolve_path(name)
+            if path is None:
+                return None
+            if entry['type'] == 'sound':
+                asset = pygame.mixer.Sound(path)
+                asset.set_volume(entry.get('volume', 1.0) * self.sfx_volume)
+            elif entry['type'] == 'animation':
+                asset = AnimatedGIF(path, background=True)
+            else:
+                asset = path
+
+        end_time = time.perf_counter()
+        self.load_times[name] = (end_time - start_time) * 1000
+        bootstrap.record(f"load {entry['type']} {name}", start_time, end_time)
+        self.load_counts[name] = self.load_counts.get(name, 0) + 1
+        self.loaded[name] = asset
+        self.evict()
+        return asset
+
+    def acquire(self, name):
+        """Get an asset and hold a reference so it is never evicted"""
+        asset = self.get(name)
+        if asset is not None:
+            self.ref_counts[name] = self.ref_counts.get(name, 0) + 1
+        return asset
+
+    def release(self, name):
+        """Drop a reference taken with acquire"""
+        if self.ref_counts.get(name, 0) > 0:
+            self.ref_counts[name] -= 1
+        self.evict()
+
+    def asset_bytes(self, name):
+        """Approximate memory held by a loaded asset"""
+        asset = self.loaded.get(name)
+        entry = self.manifest[name]
+        if asset is None:
+            return 0
+        if entry['type'] == 'sound':
+            # Decoded samples: length * rate * channels * bytes per sample
+            frequency, sample_format, channels = pygame.mixer.get_init() or (0, 0, 0)
+            return int(asset.get_length() * frequency * channels * (abs(sample_format) // 8))
+        if entry['type'] == 'animation':
+            frames = list(asset.frames)
+            for scaled in asset.scaled_frames.values():
+                frames.extend(scaled)
+            return sum(frame.get_width() * frame.get_height() * frame.get_bytesize() for frame in frames)
+        return 0
+
+    def total_bytes(self):
+        """Approximate memory held by every loaded asset"""
+        return sum(self.asset_bytes(name) for name in self.loaded)
+
+    def evict(self):
+        """Drop least recently used, unreferenced assets until under the memory budget"""
+        total = self.total_bytes()
+        for name in list(self.loaded):
+            if total <= self.max_bytes:
+                break
+            if self.ref_counts.get(name, 0) > 0:
+                continue
+            total -= self.asset_bytes(name)
+            del self.loaded[name]
+
+    def play_sound(self, name):
+        """Play a sound effect, loading it first if needed"""
+        sound = self.get(name)
+        if sound:
+            sound.play()
+
+    def set_sfx_volume(self, volume):
+        """Set the SFX volume for every loaded sound (and sounds loaded later)"""
+        self.sfx_volume = volume
+        for name, asset in self.loaded.items():
+            entry = self.manifest[name]
+            if entry['type'] == 'sound':
+                asset.set_volume(entry.get('volume', 1.0) * volume)
+
+    def play_music(self, name, volume, loops=-1):
+        """Stream a music track (loops indefinitely by default)"""
+        path = self.get(name)
+        if path is None:
+            return
+        pygame.mixer.music.load(path)
+        pygame.mixer.music.set_volume(volume)
+        pygame.mixer.music.play(loops)
+        self.current_music = name
+
+    def font(self, name, size):
+        """Return a pooled font for a manifest font at a pixel size"""
+        return get_font(self.get(name), size)
+
+    def stats(self):
+        """Return per-asset load time, bytes and reference counts for every loaded asset"""
+        return {
+            name: {
+                'type': self.manifest[name]['type'],
+                'load_ms': self.load_times.get(name, 0.0),
+                'loads': self.load_counts.get(name, 0),
+                'bytes': self.asset_bytes(name),
+                'refs': self.ref_counts.get(name, 0)
+            }
+            for name in self.loaded
+        }
+
+# Shared asset manager
+assets = AssetManager(MANIFEST)
@@ -0,0 +1,180 @@
+"""Broadphase collision benchmark: LooseQuadtree against brute-force box checks
+
+Builds worlds of 1k, 10k and 50k bodies at a constant density (mostly fish-sized boxes, some
+player-sized ones and a few large rocks) and times the tree build and its batched queries:
+every overlapping pair, hook-sized rectangles, points and fishing-line rays. The same queries
+are answered by brute force (every query against every body) and the results are compared.
+
+Usage (from the pygamefish directory):
+    python benchmarks/broadphase.py --output broadphase_bench.json
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+# Run from the game directory so module imports work
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, GAME_DIR)
+os.chdir(GAME_DIR)
+
+import numpy as np
+
+from broadphase import LooseQuadtree
+
+SIZES = (1000, 10000, 50000)
+
+# Bodies per pixel (about 5,000 on a 1080p screen)
+DENSITY = 5000 / (1920 * 1080)
+
+# Batched queries per run
+RECT_QUERIES = 1000
+POINT_QUERIES = 1000
+RAY_QUERIES = 200
+RAY_LENGTH = 400
+
+# Rows of the brute-force pair matrix handled at once (keeps its memory bounded)
+BRUTE_FORCE_CHUNK = 256
+
+def make_bodies(count, rng):
+    """Return (left, top, right, bottom) of count bodies and the world (width, height)"""
+    side = math.sqrt(count / DENSITY * 16 / 9)
+    width, height = side, side * 9 / 16
+    x = rng.uniform(0, width, count)
+    y = rng.uniform(0, height, count)
+
+    # Fish, some player-sized bodies and a few big rocks
+    kind = rng.random(count)
+    box_width = np.where(kind < 0.9, 14.0, np.where(kind < 0.99, 50.0, rng.uniform(100, 300, count)))
+    box_height = np.where(kind < 0.9, 6.0, np.where(kind < 0.99, 50.0, rng.uniform(50, 150, count)))
+    return (x - box_width / 2, y - box_height / 2, x + box_width / 2, y + box_height / 2), (width, height)
+
+def brute_force_rects(boxes, left, top, right, bottom):
+    """(query, box) for every query rectangle against every box"""
+    box_left, box_top, box_right, box_bottom = boxes
+    query_parts = []
+    box_parts = []
+    for start in range(0, len(left), BRUTE_FORCE_CHUNK):
+        end = start + BRUTE_FORCE_CHUNK
+        overlap = (
+            (box_left[None, :] <= right[start:end, None]) & (box_right[None, :] >= left[start:end, None])
+            & (box_top[None, :] <= bottom[start:end, None]) & (box_bottom[None, :] >= top[start:end, None])
+        )
+        query, box = np.nonzero(overlap)
+        query_parts.append(query + start)
+        box_parts.append(box)
+    return np.concatenate(query_parts), np.concatenate(box_parts)
+
+def brute_force_pairs(boxes):
+    """(i, j) with i < j for every overlapping pair, checking all pairs"""
+    i, j = brute_force_rects(boxes, *boxes)
+    keep = i < j
+    return i[keep], j[keep]
+
+def brute_force_rays(boxes, x0, y0, x1, y1):
+    """(ray, box) for every ray against every box (slab test)"""
+    box_left, box_top, box_right, box_bottom = boxes
+    ray_parts = []
+    box_parts = []
+    for start in range(0, len(x0), BRUTE_FORCE_CHUNK):
+        end = start + BRUTE_FORCE_CHUNK
+        with np.errstate(divide='ignore', invalid='ignore'):
+            enter_x, exit_x = LooseQuadtree.slab(
+                x0[start:end, None], (x1 - x0)[start:end, None], box_left[None, :], box_right[None, :]
+            )
+            enter_y, exit_y = LooseQuadtree.slab(
+                y0[start:end, None], (y1 - y0)[start:end, None], box_top[None, :], box_bottom[None, :]
+            )
+        hit = np.maximum(np.maximum(enter_x, enter_y), 0.0) <= np.minimum(np.minimum(exit_x, exit_y), 1.0)
+        ray, box = np.nonzero(hit)
+        ray_parts.append(ray + start)
+        box_parts.append(box)
+    return np.concatenate(ray_parts), np.concatenate(box_parts)
+
+def as_set(first, second):
+    """Result pairs as a set, for comparing tree and brute-force answers"""
+    return set(zip(first.tolist(), second.tolist()))
+
+def timed(func, repeats):
+    """(median seconds per call, result of the last call)"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)), result
+
+def bench_size(count, repeats, rng):
+    """Time the tree and brute force on every query type for one world"""
+    boxes, (width, height) = make_bodies(count, rng)
+    tree = LooseQuadtree()
+    build_time, _ = timed(lambda: tree.build(*boxes), repeats)
+
+    # Hook-sized rectangles, points, and fishing lines cast from random spots
+    rect_x = rng.uniform(0, width, RECT_QUERIES)
+    rect_y = rng.uniform(0, height, RECT_QUERIES)
+    rects = (rect_x - 4, rect_y - 4, rect_x + 4, rect_y + 4)
+    points = (rng.uniform(0, width, POINT_QUERIES), rng.uniform(0, height, POINT_QUERIES))
+    angle = rng.uniform(0, 2 * math.pi, RAY_QUERIES)
+    ray_x = rng.uniform(0, width, RAY_QUERIES)
+    ray_y = rng.uniform(0, height, RAY_QUERIES)
+    rays = (ray_x, ray_y, ray_x + np.cos(angle) * RAY_LENGTH, ray_y + np.sin(angle) * RAY_LENGTH)
+
+    queries = {
+        'pairs': (tree.pairs, lambda: brute_force_pairs(boxes)),
+        'rects': (lambda: tree.query_rects(*rects), lambda: brute_force_rects(boxes, *rects)),
+        'points': (lambda: tree.query_points(*points), lambda: brute_force_rects(boxes, *points, *points)),
+        'rays': (lambda: tree.query_rays(*rays)[:2], lambda: brute_force_rays(boxes, *rays)),
+    }
+
+    result = {
+        'bodies': count,
+        'area': [round(width), round(height)],
+        'levels': len(tree.levels),
+        'build_ms': build_time * 1000
+    }
+    for name, (tree_query, brute_query) in queries.items():
+        tree_time, tree_result = timed(tree_query, repeats)
+        brute_time, brute_result = timed(brute_query, max(repeats // 5, 1))
+        result[name] = {
+            'tree_ms': tree_time * 1000,
+            'brute_force_ms': brute_time * 1000,
+            'speedup': brute_time / tree_time,
+            'hits': len(tree_result[0]),
+            'matches_brute_force': as_set(*tree_result) == as_set(*brute_result)
+        }
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Broadphase collision benchmark against brute force")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--repeats", type=int, default=10, help="timed repeats per query (brute force runs a fifth)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="broadphase_bench.json", help="JSON results file")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    results = []
+    for count in args.sizes:
+        result = bench_size(count, args.repeats, rng)
+        results.append(result)
+        print(f"{count:>6} bodies: build {result['build_ms']:.2f}ms ({result['levels']} levels)")
+        for name in ('pairs', 'rects', 'points', 'rays'):
+            query = result[name]
+            match = "" if query['matches_brute_force'] else "  MISMATCH"
+            print(f"    {name:<6} tree {query['tree_ms']:9.2f}ms  brute {query['brute_force_ms']:10.2f}ms  "
+                  f"{query['speedup']:8.1f}x  ({query['hits']} hits){match}")
+
+    report = {
+        'density_bodies_per_px': DENSITY,
+        'queries': {'rects': RECT_QUERIES, 'points': POINT_QUERIES, 'rays': RAY_QUERIES, 'ray_length': RAY_LENGTH},
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Dirty-rect rendering check: every frame of the dirty-rect game loop against full redraws
+
+Plays the same scripted session through the game loop twice, once with full redraws and once
+with dirty-rect rendering, and compares the two screens pixel by pixel after every frame. The
+session walks in every direction (so the camera scrolls), toggles F11 into fullscreen and back,
+and resizes the window. The dirty-rect path should never differ from the full redraw, and the
+full redraw has to paint the whole screen.
+
+Usage (from the pygamefish directory):
+    python benchmarks/dirty_rects.py --frames 360
+"""
+import argparse
+import os
+import sys
+import zlib
+
+# Run from the game directory so relative asset paths and module imports work
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, GAME_DIR)
+os.chdir(GAME_DIR)
+
+import headless  # Selects SDL's dummy drivers before pygame initializes
+import pygame
+import numpy as np
+
+import start_screen
+from input_source import ScriptedInput
+
+# Session RNG seed, both runs have to spawn the same fish
+SEED = 1234
+
+# The full-redraw run paints the screen this color after every frame, so anything a frame doesn't
+# draw (e.g. past the camera's view) shows up as a difference instead of matching stale pixels
+UNPAINTED = (255, 0, 255)
+
+def session_script(frames):
+    """Scripted session: walk around, F11 into fullscreen and back, resize the window"""
+    step = max(frames // 6, 2)
+    resize = pygame.event.Event(pygame.VIDEORESIZE, size=(640, 480), w=640, h=480)
+    return {
+        0: {'keys': [pygame.K_RIGHT, pygame.K_DOWN]},
+        step: {'keys': [pygame.K_LEFT, pygame.K_F11]},        # Into fullscreen
+        step + 1: {'keys': [pygame.K_LEFT]},
+        2 * step: {'keys': [pygame.K_UP, pygame.K_F11]},      # Back to the window
+        2 * step + 1: {'keys': [pygame.K_UP]},
+        3 * step: {'keys': [pygame.K_RIGHT], 'events': [resize]},
+        4 * step: {'keys': []},                               # Standing still
+        5 * step: {'keys': [pygame.K_LEFT, pygame.K_DOWN]},
+    }
+
+class CapturingInput(ScriptedInput):
+    """Scripted input that hands the last drawn frame's screen to a callback on every poll"""
+    def __init__(self, script, on_frame):
+        super().__init__(script)
+        self.on_frame = on_frame
+
+    def poll(self):
+        if self.frame:
+            self.on_frame(self.frame - 1, pygame.display.get_surface())
+        return super().poll()
+
+def run_session(frames, dirty_rects, on_frame):
+    """Play the scripted session once, calling on_frame(frame, screen) after every frame"""
+    start_screen.seed_rng(SEED)
+    input_source = CapturingInput(session_script(frames), on_frame)
+    headless.run_game(frames=frames, input_source=input_source, dirty_rects=dirty_rects)
+    on_frame(input_source.frame - 1, pygame.display.get_surface())
+
+def screen_pixels(surface):
+    """(size, compressed RGB bytes) of a screen"""
+    return surface.get_size(), zlib.compress(pygame.image.tobytes(surface, 'RGB'), 1)
+
+def as_array(size, data):
+    """Pixels of a screen_pixels() result as a (height, width, 3) array"""
+    width, height = size
+    return np.frombuffer(zlib.decompress(data), dtype=np.uint8).reshape(height, width, 3)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare dirty-rect frames against full redraws")
+    parser.add_argument("--frames", type=int, default=360, help="frames in the scripted session")
+    args = parser.parse_args()
+
+    # Full redraws first, every frame kept (compressed) to compare against
+    reference = {}
+
+    def keep(frame, surface):
+        reference[frame] = screen_pixels(surface)
+        surface.fill(UNPAINTED)
+
+    run_session(args.frames, False, keep)
+
+    mismatches = []
+
+    def compare(frame, surface):
+        size, data = reference[frame]
+        if surface.get_size() != size:
+            mismatches.append((frame, f"size {surface.get_size()} instead of {size}"))
+            return
+        expected = as_array(size, data)
+        actual = as_array(*screen_pixels(surface))
+        differs = (expected != actual).any(axis=2)
+        if differs.any():
+            rows, cols = np.nonzero(differs)
+            mismatches.append((frame, f"{len(rows)} pixels differ in x {cols.min()}-{cols.max()}, y {rows.min()}-{rows.max()}"))
+
+    run_session(args.frames, True, compare)
+
+    for frame, detail in mismatches[:10]:
+        print(f"frame {frame}: {detail}")
+    if mismatches:
+        print(f"{len(mismatches)} of {len(reference)} dirty-rect frames differ from the full redraw")
+    else:
+        print(f"all {len(reference)} dirty-rect frames match the full redraw")
+
+    pygame.quit()
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
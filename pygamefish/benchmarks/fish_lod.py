@@ -0,0 +1,113 @@
+"""Simulation level-of-detail benchmark for the fish population
+
+Sweeps an 1080p camera across worlds of growing size and population (at the game's density
+and at much higher ones) and times PopulationLOD ticks. Tick cost should stay about flat, as
+only the fish around the camera are simulated one by one. Simulating every fish each tick is
+timed for the smaller populations for comparison.
+
+Usage (from the pygamefish directory):
+    python benchmarks/fish_lod.py --output lod_bench.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+# Run from the game directory so module imports work
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, GAME_DIR)
+os.chdir(GAME_DIR)
+
+import numpy as np
+
+from chunks import Camera
+from entities import EntityStore
+from fish_school import FishSchool
+from lod import PopulationLOD
+
+VIEW = (1920, 1080)
+
+# (world width, world height, population)
+CASES = (
+    (8192, 4608, 10000),
+    (8192, 4608, 100000),
+    (32768, 18432, 160000),
+    (32768, 18432, 1000000),
+)
+
+FULL_SIMULATION_LIMIT = 20000
+
+def sweep_position(tick, ticks, width, height):
+    """Camera target moving diagonally across the middle of the world at the player's speed"""
+    return width / 2 - ticks * 2.5 + tick * 5, height / 2 - ticks * 1.5 + tick * 3
+
+def time_ticks(tick, ticks):
+    """Seconds per tick, one sample per tick"""
+    times = np.empty(ticks)
+    for i in range(ticks):
+        start = time.perf_counter()
+        tick(i)
+        times[i] = time.perf_counter() - start
+    return times
+
+def bench_case(width, height, population, ticks):
+    """Time LOD ticks (and full simulation when small enough) for one world"""
+    store = EntityStore()
+    school = FishSchool(store, 0, width, height, np.random.default_rng(0))
+    lod = PopulationLOD(school, width, height, population)
+    camera = Camera(VIEW[0], VIEW[1], width, height)
+
+    def lod_tick(i):
+        x, y = sweep_position(i, ticks, width, height)
+        camera.follow(x, y)
+        lod.update(camera, x, y)
+
+    times = time_ticks(lod_tick, ticks)
+    stats = lod.stats()
+    result = {
+        'world': [width, height],
+        'population': population,
+        'lod_tick_ms': float(times.mean() * 1000),
+        'lod_tick_p95_ms': float(np.percentile(times, 95) * 1000),
+        'live_fish': stats['live'],
+        'near_fish': stats['near'],
+        'spawned': stats['spawned'],
+        'folded': stats['folded'],
+        'population_kept': stats['live'] + stats['far'] == population
+    }
+
+    if population <= FULL_SIMULATION_LIMIT:
+        full_store = EntityStore()
+        full_school = FishSchool(full_store, population, width, height, np.random.default_rng(0))
+
+        def full_tick(i):
+            x, y = sweep_position(i, ticks, width, height)
+            full_school.steer(x, y, width, height)
+            full_store.step()
+            full_school.confine(width, height)
+
+        result['full_tick_ms'] = float(time_ticks(full_tick, max(ticks // 10, 10)).mean() * 1000)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Fish population level-of-detail benchmark")
+    parser.add_argument("--ticks", type=int, default=600, help="simulation ticks per world")
+    parser.add_argument("--output", default="lod_bench.json", help="JSON results file")
+    args = parser.parse_args()
+
+    results = []
+    for width, height, population in CASES:
+        result = bench_case(width, height, population, args.ticks)
+        results.append(result)
+        full = f" full={result['full_tick_ms']:.2f}ms" if 'full_tick_ms' in result else ""
+        print(f"{width}x{height} {population:>8} fish: lod tick {result['lod_tick_ms']:.2f}ms "
+              f"(p95 {result['lod_tick_p95_ms']:.2f}ms, {result['live_fish']} live){full}")
+
+    report = {'view': list(VIEW), 'results': results}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Neighbor-query scaling benchmark for the fish school
+
+Grows the school at a constant density (the area grows with the fish count) and times the grid
+neighbor queries and a full steering tick per size. With the grid, cost per fish should stay
+about flat (near-linear total). A brute-force all-pairs search is timed for the smaller sizes
+for comparison.
+
+Usage (from the pygamefish directory):
+    python benchmarks/fish_neighbors.py --output fish_bench.json
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+# Run from the game directory so module imports work
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, GAME_DIR)
+os.chdir(GAME_DIR)
+
+import numpy as np
+
+from entities import EntityStore
+from fish_school import FishSchool
+
+SIZES = (500, 1000, 2000, 5000, 10000, 20000, 40000)
+
+# Fish per pixel of a 1080p screen holding 5,000 fish
+DENSITY = 5000 / (1920 * 1080)
+
+BRUTE_FORCE_LIMIT = 2000
+
+def neighbor_queries(school):
+    """The school's neighbor work for one tick (grid rebuilds, cell sums, separation pairs)"""
+    store = school.store
+    x = store.x[school.ids]
+    y = store.y[school.ids]
+    grid = school.grid
+    grid.rebuild(x, y)
+    for weights in (None, x, y, store.vel_x[school.ids], store.vel_y[school.ids]):
+        grid.neighborhood_sums(weights)
+    school.separation_grid.rebuild(x, y)
+    return school.separation_grid.neighbor_pairs(x, y, school.SEPARATION_RADIUS)
+
+def brute_force_pairs(x, y, radius):
+    """Every pair closer than radius by checking all pairs"""
+    dx = x[:, None] - x[None, :]
+    dy = y[:, None] - y[None, :]
+    return np.nonzero(np.triu(dx * dx + dy * dy < radius * radius, 1))
+
+def time_calls(func, repeats):
+    """Median seconds per call"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+def bench_size(count, warmup, repeats):
+    """Time neighbor queries and steering for one school size"""
+    side = math.sqrt(count / DENSITY * 16 / 9)
+    width, height = side, side * 9 / 16
+    store = EntityStore()
+    school = FishSchool(store, count, width, height, np.random.default_rng(0))
+
+    # Let the school form flocks first, dense flocks are the expensive case
+    def tick():
+        school.steer(width / 2, height / 2, width, height)
+        store.step()
+        school.confine(width, height)
+
+    for _ in range(warmup):
+        tick()
+
+    query_time = time_calls(lambda: neighbor_queries(school), repeats)
+    tick_time = time_calls(tick, repeats)
+    pairs = len(neighbor_queries(school)[0])
+
+    result = {
+        'fish': count,
+        'area': [round(width), round(height)],
+        'separation_pairs': pairs,
+        'neighbor_query_ms': query_time * 1000,
+        'neighbor_query_us_per_fish': query_time / count * 1e6,
+        'tick_ms': tick_time * 1000,
+        'tick_us_per_fish': tick_time / count * 1e6,
+    }
+    if count <= BRUTE_FORCE_LIMIT:
+        x = store.x[school.ids]
+        y = store.y[school.ids]
+        brute_time = time_calls(lambda: brute_force_pairs(x, y, school.SEPARATION_RADIUS), max(repeats // 10, 3))
+        result['brute_force_ms'] = brute_time * 1000
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Fish school neighbor-query scaling benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--warmup", type=int, default=120, help="ticks before timing (lets flocks form)")
+    parser.add_argument("--repeats", type=int, default=50, help="timed repeats per size")
+    parser.add_argument("--output", default="fish_bench.json", help="JSON results file")
+    args = parser.parse_args()
+
+    results = []
+    for count in args.sizes:
+        result = bench_size(count, args.warmup, args.repeats)
+        results.append(result)
+        brute = f" brute={result['brute_force_ms']:.2f}ms" if 'brute_force_ms' in result else ""
+        print(f"{count:>6} fish: neighbors {result['neighbor_query_ms']:7.2f}ms "
+              f"({result['neighbor_query_us_per_fish']:.2f}us/fish) tick {result['tick_ms']:7.2f}ms "
+              f"({result['tick_us_per_fish']:.2f}us/fish){brute}")
+
+    # Per-fish cost growth from the smallest to the largest school (1.0 = perfectly linear)
+    first, last = results[0], results[-1]
+    report = {
+        'density_fish_per_px': DENSITY,
+        'per_fish_growth': last['neighbor_query_us_per_fish'] / first['neighbor_query_us_per_fish'],
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Per-fish neighbor cost grew {report['per_fish_growth']:.2f}x from {first['fish']} to {last['fish']} fish")
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
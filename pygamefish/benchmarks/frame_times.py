@@ -0,0 +1,226 @@
+"""Frame-time benchmark for the start screen and game loops (headless)
+
+Sweeps window resolutions (which sweeps the menu bubble count) and cursor positions, and
+reports p50/p95/p99 frame time per phase, allocations per frame and throughput as JSON.
+
+Usage (from the pygamefish directory):
+    python benchmarks/frame_times.py --frames 300 --output frame_bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+# Run from the game directory so relative asset paths and module imports work
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, GAME_DIR)
+os.chdir(GAME_DIR)
+
+import headless  # Selects SDL's dummy drivers before pygame initializes
+import pygame
+import numpy as np
+
+import start_screen
+from input_source import ScriptedInput
+from text_cache import text_cache
+from frame_stats import frame_stats, PHASES
+
+RESOLUTIONS = {
+    '800x600': (800, 600),
+    '1080p': (1920, 1080),
+    '4k': (3840, 2160),
+}
+
+CURSORS = ('offscreen', 'center', 'sweep')
+
+def percentiles(samples):
+    """Summarize frame-time samples (seconds) in milliseconds"""
+    ms = np.asarray(samples) * 1000
+    return {
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'p99_ms': float(np.percentile(ms, 99)),
+        'mean_ms': float(ms.mean()),
+    }
+
+def cursor_script(cursor, size, frames):
+    """Mouse positions for a cursor pattern as a ScriptedInput script"""
+    width, height = size
+    if cursor == 'offscreen':
+        return {0: {'mouse': (-1000, -1000)}}
+    if cursor == 'center':
+        return {0: {'mouse': (width // 2, height // 2)}}
+
+    # Sweep diagonally across the window once over the run
+    return {
+        frame: {'mouse': (int(width * frame / frames), int(height * frame / frames))}
+        for frame in range(frames)
+    }
+
+def set_resolution(size):
+    """Resize the shared window and everything that depends on it"""
+    width, height = size
+
+    # Maximized at this size, run_game picks its window size from the maximized size
+    start_screen.restore_window_state(width, height, width, height, True)
+
+def bench_menu(size, cursor, frames, warmup):
+    """Time each phase of the start screen loop"""
+    set_resolution(size)
+    menu = start_screen.StartScreen(ScriptedInput(cursor_script(cursor, size, frames + warmup)))
+    if menu.logo_animation:
+        menu.logo_animation.wait()
+
+    phases = {'events': [], 'update': [], 'draw': [], 'flip': [], 'frame': []}
+
+    for frame in range(frames + warmup):
+        if frame == warmup:
+            # Every sprite a bubble can need is rendered by now, the cache holds them all
+            menu.bubble_sprites.prerender(menu.bubbles)
+            menu.bubble_sprites.reset_stats()
+            text_cache.reset_stats()
+
+        start = time.perf_counter()
+        menu.handle_events()
+        after_events = time.perf_counter()
+        menu.update()
+        after_update = time.perf_counter()
+        menu.draw()
+        after_draw = time.perf_counter()
+        pygame.display.flip()
+        end = time.perf_counter()
+
+        if frame >= warmup:
+            phases['events'].append(after_events - start)
+            phases['update'].append(after_update - after_events)
+            phases['draw'].append(after_draw - after_update)
+            phases['flip'].append(end - after_draw)
+            phases['frame'].append(end - start)
+
+    sprite_misses = menu.bubble_sprites.misses
+    assert sprite_misses == 0 and menu.bubble_sprites.evictions == 0, (
+        f"bubble sprite cache missed {sprite_misses} times after warm-up "
+        f"({menu.bubble_sprites.evictions} evictions), the cache is smaller than its key space"
+    )
+    text_renders = text_cache.renders
+
+    # Separate pass for allocations, tracemalloc distorts timings
+    tracemalloc.start()
+    allocated = []
+    for _ in range(min(frames, 60)):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        menu.handle_events()
+        menu.update()
+        menu.draw()
+        pygame.display.flip()
+        _, peak = tracemalloc.get_traced_memory()
+        allocated.append(peak - before)
+    tracemalloc.stop()
+
+    frame_mean = float(np.mean(phases['frame']))
+    return {
+        'scene': 'menu',
+        'resolution': list(size),
+        'cursor': cursor,
+        'bubbles': len(menu.bubbles),
+        'frames': frames,
+        'phases': {name: percentiles(samples) for name, samples in phases.items()},
+        'alloc_peak_bytes_per_frame': float(np.mean(allocated)),
+        'sprite_surfaces_per_frame': sprite_misses / frames,
+        'text_renders_per_frame': text_renders / frames,
+        'fps': 1.0 / frame_mean,
+        'bubbles_per_second': len(menu.bubbles) / frame_mean,
+    }
+
+class TimedInput(ScriptedInput):
+    """Scripted input that timestamps every poll, each poll starts a new game frame"""
+    def __init__(self, script):
+        super().__init__(script)
+        self.poll_times = []
+
+    def poll(self):
+        self.poll_times.append(time.perf_counter())
+        return super().poll()
+
+def bench_game(size, frames, warmup, dirty_rects):
+    """Time each phase of the game loop (player walking right, then left)
+
+    Phases come from the loop's own frame_stats recording (top-level phases plus sub-phases
+    such as fish.update or chunks.draw), whole frames from the poll timestamps.
+    """
+    set_resolution(size)
+    script = {0: {'keys': [pygame.K_RIGHT]}, (frames + warmup) // 2: {'keys': [pygame.K_LEFT]}}
+    input_source = TimedInput(script)
+    frame_stats.enabled = True
+    first_frame = frame_stats.frame_count
+    headless.run_game(frames=frames + warmup, input_source=input_source, dirty_rects=dirty_rects)
+
+    frame_times = np.diff(input_source.poll_times)[warmup:]
+    phases = {'frame': percentiles(frame_times)}
+
+    # Per-phase samples (ms) of the measured frames this run recorded
+    recorded = min(frame_stats.frame_count - first_frame - warmup, frame_stats.capacity)
+    samples, _ = frame_stats.recent(recorded)
+    for phase, column in frame_stats.columns.items():
+        if phase != 'total' and (phase in PHASES or samples[:, column].any()):
+            phases[phase] = percentiles(samples[:, column] / 1000)
+    return {
+        'scene': 'game',
+        'resolution': list(size),
+        'dirty_rects': dirty_rects,
+        'frames': len(frame_times),
+        'phases': phases,
+        'fps': 1.0 / float(np.mean(frame_times)),
+    }
+
+def git_revision():
+    """Current commit, so results from different commits can be compared"""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=GAME_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Frame-time benchmark for the menu and game loops")
+    parser.add_argument("--frames", type=int, default=300, help="measured frames per case")
+    parser.add_argument("--warmup", type=int, default=30, help="unmeasured frames before each case")
+    parser.add_argument("--resolutions", nargs="+", choices=sorted(RESOLUTIONS), default=list(RESOLUTIONS))
+    parser.add_argument("--output", default="frame_bench.json", help="JSON results file")
+    args = parser.parse_args()
+
+    results = []
+    for name in args.resolutions:
+        size = RESOLUTIONS[name]
+        for cursor in CURSORS:
+            result = bench_menu(size, cursor, args.frames, args.warmup)
+            results.append(result)
+            print(f"menu {name:>7} cursor={cursor:<9} bubbles={result['bubbles']:>5} "
+                  f"p50={result['phases']['frame']['p50_ms']:.2f}ms p99={result['phases']['frame']['p99_ms']:.2f}ms")
+        for dirty_rects in (False, True):
+            result = bench_game(size, args.frames, args.warmup, dirty_rects)
+            results.append(result)
+            phases = result['phases']
+            print(f"game {name:>7} dirty={dirty_rects!s:<5} "
+                  f"p50={phases['frame']['p50_ms']:.2f}ms p99={phases['frame']['p99_ms']:.2f}ms ("
+                  + " ".join(f"{phase}={phases[phase]['p50_ms']:.2f}" for phase in PHASES) + ")")
+
+    report = {
+        'commit': git_revision(),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+# Startup timeline starts when this module is first imported
+TRACE_ORIGIN = time.perf_counter()
+
+# Results of stages that already ran, so repeated startup code reuses them instead of running again
+_results = {}
+
+# Per-stage timing and how often each stage was requested, for the startup report
+stage_times = {}
+stage_requests = {}
+
+# Every timed stage in the order it ran (start/duration in ms relative to TRACE_ORIGIN)
+timeline = []
+
+DEFAULT_TRACE_PATH = 'startup_trace.json'
+
+def record(stage, start_time, end_time):
+    """Add a stage to the startup timeline (times from time.perf_counter)"""
+    timeline.append({
+        'stage': stage,
+        'start_ms': (start_time - TRACE_ORIGIN) * 1000,
+        'duration_ms': (end_time - start_time) * 1000
+    })
+
+@contextmanager
+def timed(stage):
+    """Time a block as a startup stage"""
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, start_time, time.perf_counter())
+
+def run_once(stage, func, *args, **kwargs):
+    """Run a startup stage the first time it is requested and return its cached result afterwards"""
+    stage_requests[stage] = stage_requests.get(stage, 0) + 1
+    if stage in _results:
+        return _results[stage]
+
+    start_time = time.perf_counter()
+    result = func(*args, **kwargs)
+    end_time = time.perf_counter()
+    stage_times[stage] = (end_time - start_time) * 1000
+    record(stage, start_time, end_time)
+    _results[stage] = result
+    return result
+
+def has_run(stage):
+    """Return True if a stage already ran"""
+    return stage in _results
+
+def report():
+    """Print each startup stage with its duration and how many times it was requested"""
+    print("Startup stages:")
+    for stage, duration in stage_times.items():
+        requests = stage_requests.get(stage, 0)
+        repeats = f" ({requests - 1} repeat request(s) skipped)" if requests > 1 else ""
+        print(f"  {stage}: ran once, {duration:.1f} ms{repeats}")
+
+def process_age_ms():
+    """Milliseconds between process start and TRACE_ORIGIN (Linux only, None elsewhere)"""
+    try:
+        with open('/proc/self/stat') as f:
+            # Fields after the command name (which may contain spaces), starttime is field 22
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        started = int(fields[19]) / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+    return (uptime - started) * 1000 - (time.perf_counter() - TRACE_ORIGIN) * 1000
+
+def startup_trace_path():
+    """Return where to write the startup trace, or None if tracing is off
+
+    Enabled with --startup-trace[=PATH] or FISHGAME_STARTUP_TRACE=PATH (1 = default path)
+    """
+    for arg in sys.argv[1:]:
+        if arg == '--startup-trace':
+            return DEFAULT_TRACE_PATH
+        if arg.startswith('--startup-trace='):
+            return arg.split('=', 1)[1] or DEFAULT_TRACE_PATH
+
+    env_path = os.environ.get('FISHGAME_STARTUP_TRACE')
+    if env_path:
+        return DEFAULT_TRACE_PATH if env_path == '1' else env_path
+    return None
+
+def startup_trace(extra=None):
+    """Build the machine-readable startup report"""
+    process_offset = process_age_ms()
+    stages = sorted(timeline, key=lambda entry: entry['start_ms'])
+    end_ms = max((entry['start_ms'] + entry['duration_ms'] for entry in stages), default=0.0)
+    first_frame_ms = next(
+        (entry['start_ms'] + entry['duration_ms'] for entry in stages if entry['stage'] == 'first flip'), None
+    )
+
+    trace = {
+        'process_start_to_trace_origin_ms': process_offset,
+        'trace_origin_to_first_frame_ms': first_frame_ms,
+        'process_start_to_first_frame_ms': (
+            None if process_offset is None or first_frame_ms is None else process_offset + first_frame_ms
+        ),
+        'trace_origin_to_last_stage_ms': end_ms,
+        'process_start_to_last_stage_ms': None if process_offset is None else process_offset + end_ms,
+        'stages': stages,
+        'repeat_requests': {
+            stage: count - 1 for stage, count in stage_requests.items() if count > 1
+        }
+    }
+    if extra:
+        trace.update(extra)
+    return trace
+
+def write_startup_trace(path, extra=None):
+    """Write the startup report as JSON"""
+    trace = startup_trace(extra)
+    with open(path, 'w') as f:
+        json.dump(trace, f, indent=2)
+    print(f"Startup trace written to {path}")
+    return trace
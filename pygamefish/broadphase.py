@@ -0,0 +1,246 @@
+import math
+
+import numpy as np
+
+class QuadtreeLevel:
+    """One depth of a loose quadtree: a flat grid of cells with the box ids sorted by cell"""
+    def __init__(self, depth, cell_size, side, order, starts, reach_x, reach_y):
+        self.depth = depth
+        self.cell_size = cell_size
+        self.side = side      # Cells per side
+        self.order = order    # Box ids sorted by cell
+        self.starts = starts  # Where each cell starts in order (side * side + 1 entries)
+
+        # How far the boxes on this level reach from their center (at most half a cell)
+        self.reach_x = reach_x
+        self.reach_y = reach_y
+
+class LooseQuadtree:
+    """Broadphase over axis-aligned boxes (left, top, right, bottom), rebuilt and queried in batches
+
+    Every box lives in exactly one cell: at the deepest level whose cells are at least as big as
+    the box, in the cell holding its center. Cells are loose (a box sticks out at most half a cell
+    past its cell), so boxes never straddle cells and a rebuild is one sort per level. Levels are
+    flat grids rather than node objects, so every query expands into candidate ranges and exact
+    box tests with NumPy instead of walking the tree box by box.
+
+    Queries take arrays (one entry per query) and return (query index, box index, ...) arrays in
+    no particular order, except rays, which come back sorted by ray and then by hit distance.
+    """
+    def __init__(self, max_depth=10):
+        self.max_depth = max_depth
+        self.levels = []
+
+        # Boxes (set by build)
+        self.left = self.top = self.right = self.bottom = np.empty(0)
+        self.depth = np.empty(0, dtype=np.int64)
+
+        # Square covered by the root cell
+        self.origin_x = 0.0
+        self.origin_y = 0.0
+        self.size = 1.0
+
+    def build(self, left, top, right, bottom):
+        """Insert every box, replacing the previous contents"""
+        self.left = left = np.asarray(left, dtype=np.float64)
+        self.top = top = np.asarray(top, dtype=np.float64)
+        self.right = right = np.asarray(right, dtype=np.float64)
+        self.bottom = bottom = np.asarray(bottom, dtype=np.float64)
+        self.levels = []
+        if len(left) == 0:
+            self.depth = np.empty(0, dtype=np.int64)
+            return
+
+        # Root covers the bounding box of the boxes
+        self.origin_x = float(left.min())
+        self.origin_y = float(top.min())
+        self.size = max(float(right.max()) - self.origin_x, float(bottom.max()) - self.origin_y, 1.0)
+
+        # Deepest level whose cells still fit the box (points go to the deepest level), with a
+        # little slack so rounding never leaves a box more than half a cell past its cell
+        extent = np.maximum(right - left, bottom - top)
+        with np.errstate(divide='ignore'):
+            depth = np.floor(np.log2(self.size / extent) - 1e-9)
+        self.depth = depth = np.clip(np.nan_to_num(depth, posinf=self.max_depth), 0, self.max_depth).astype(np.int64)
+
+        center_x = (left + right) / 2
+        center_y = (top + bottom) / 2
+        for level_depth in np.unique(depth).tolist():
+            ids = np.flatnonzero(depth == level_depth)
+            side = 1 << level_depth
+            cell_size = self.size / side
+            col, row = self.cell_of(center_x[ids], center_y[ids], cell_size, side)
+            cell = row * side + col
+            order = ids[np.argsort(cell, kind='stable')]
+            starts = np.zeros(side * side + 1, dtype=np.int64)
+            np.cumsum(np.bincount(cell, minlength=side * side), out=starts[1:])
+            reach_x = float((right[ids] - left[ids]).max()) / 2
+            reach_y = float((bottom[ids] - top[ids]).max()) / 2
+            self.levels.append(QuadtreeLevel(level_depth, cell_size, side, order, starts, reach_x, reach_y))
+
+    def __len__(self):
+        return len(self.left)
+
+    def cell_of(self, x, y, cell_size, side):
+        """Return the (col, row) cell of positions on a level, clamped to the grid"""
+        col = np.clip(np.floor((x - self.origin_x) / cell_size), 0, side - 1).astype(np.int64)
+        row = np.clip(np.floor((y - self.origin_y) / cell_size), 0, side - 1).astype(np.int64)
+        return col, row
+
+    def gather(self, level, owners, rows, first_cols, last_cols):
+        """Return (owner, box) for every box in cells first_col..last_col of each owner's row"""
+        base = rows * level.side
+        begin = level.starts[base + first_cols]
+        counts = level.starts[base + last_cols + 1] - begin
+        total = int(counts.sum())
+        run_starts = np.cumsum(counts) - counts
+        positions = np.repeat(begin - run_starts, counts) + np.arange(total)
+        return np.repeat(owners, counts), level.order[positions]
+
+    def rect_candidates(self, level, owners, left, top, right, bottom):
+        """Return (owner, box) for boxes on a level whose loose cells overlap each owner's rectangle
+
+        left, top, right, bottom hold one rectangle per entry of owners.
+        """
+        side = level.side
+
+        # Grow by how far the level's boxes reach past their center (so past their cell)
+        first_col = np.floor((left - level.reach_x - self.origin_x) / level.cell_size).astype(np.int64)
+        last_col = np.floor((right + level.reach_x - self.origin_x) / level.cell_size).astype(np.int64)
+        first_row = np.floor((top - level.reach_y - self.origin_y) / level.cell_size).astype(np.int64)
+        last_row = np.floor((bottom + level.reach_y - self.origin_y) / level.cell_size).astype(np.int64)
+        inside = (last_col >= 0) & (first_col < side) & (last_row >= 0) & (first_row < side)
+        owners = owners[inside]
+        first_col = np.clip(first_col[inside], 0, side - 1)
+        last_col = np.clip(last_col[inside], 0, side - 1)
+        first_row = np.clip(first_row[inside], 0, side - 1)
+        last_row = np.clip(last_row[inside], 0, side - 1)
+
+        # One gather per (owner, row), rows of a cell range are contiguous in the sorted order
+        row_counts = last_row - first_row + 1
+        total = int(row_counts.sum())
+        run_starts = np.cumsum(row_counts) - row_counts
+        repeat = np.repeat(np.arange(len(owners)), row_counts)
+        rows = first_row[repeat] + np.arange(total) - run_starts[repeat]
+        return self.gather(level, owners[repeat], rows, first_col[repeat], last_col[repeat])
+
+    def overlapping(self, owner_boxes, boxes, left, top, right, bottom):
+        """Mask of candidate boxes that really overlap their owner's rectangle (edges touching count)"""
+        return (
+            (self.left[boxes] <= right[owner_boxes]) & (self.right[boxes] >= left[owner_boxes])
+            & (self.top[boxes] <= bottom[owner_boxes]) & (self.bottom[boxes] >= top[owner_boxes])
+        )
+
+    def query_rects(self, left, top, right, bottom):
+        """Return (query, box) for every box overlapping each query rectangle"""
+        left = np.atleast_1d(np.asarray(left, dtype=np.float64))
+        top = np.atleast_1d(np.asarray(top, dtype=np.float64))
+        right = np.atleast_1d(np.asarray(right, dtype=np.float64))
+        bottom = np.atleast_1d(np.asarray(bottom, dtype=np.float64))
+        queries = np.arange(len(left))
+
+        query_parts = []
+        box_parts = []
+        for level in self.levels:
+            owners, boxes = self.rect_candidates(level, queries, left, top, right, bottom)
+            hit = self.overlapping(owners, boxes, left, top, right, bottom)
+            query_parts.append(owners[hit])
+            box_parts.append(boxes[hit])
+        return self.joined(query_parts, box_parts)
+
+    def query_points(self, x, y):
+        """Return (query, box) for every box containing each query point"""
+        return self.query_rects(x, y, x, y)
+
+    def pairs(self):
+        """Return (i, j) with i < j for every pair of overlapping boxes, each pair once
+
+        Every level is searched by the boxes on it and on the deeper levels, so a pair is found
+        from the box on the deeper level (or, on the same level, kept only from the lower id).
+        """
+        i_parts = []
+        j_parts = []
+        for level in self.levels:
+            owners = np.flatnonzero(self.depth >= level.depth)
+            i, j = self.rect_candidates(
+                level, owners, self.left[owners], self.top[owners], self.right[owners], self.bottom[owners]
+            )
+            keep = self.overlapping(i, j, self.left, self.top, self.right, self.bottom)
+            keep &= (self.depth[i] > level.depth) | (i < j)
+            i = i[keep]
+            j = j[keep]
+            i_parts.append(np.minimum(i, j))
+            j_parts.append(np.maximum(i, j))
+        return self.joined(i_parts, j_parts)
+
+    def query_rays(self, x0, y0, x1, y1):
+        """Return (ray, box, t) for every box each segment (x0, y0) -> (x1, y1) passes through
+
+        t is where the segment enters the box (0.0 at the start, 1.0 at the end, 0.0 when it
+        starts inside). Hits are sorted by ray and then by t, so the first hit of each ray is
+        at np.unique(ray, return_index=True)[1].
+        """
+        x0 = np.atleast_1d(np.asarray(x0, dtype=np.float64))
+        y0 = np.atleast_1d(np.asarray(y0, dtype=np.float64))
+        dx = np.atleast_1d(np.asarray(x1, dtype=np.float64)) - x0
+        dy = np.atleast_1d(np.asarray(y1, dtype=np.float64)) - y0
+        length = np.sqrt(dx * dx + dy * dy)
+
+        ray_parts = []
+        box_parts = []
+        for level in self.levels:
+            # Split every ray into pieces no longer than a cell and search around each piece's bounds
+            pieces = np.maximum(np.ceil(length / level.cell_size).astype(np.int64), 1)
+            total = int(pieces.sum())
+            owners = np.repeat(np.arange(len(x0)), pieces)
+            piece = np.arange(total) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+            t_start = piece / pieces[owners]
+            t_end = (piece + 1) / pieces[owners]
+            start_x = x0[owners] + dx[owners] * t_start
+            start_y = y0[owners] + dy[owners] * t_start
+            end_x = x0[owners] + dx[owners] * t_end
+            end_y = y0[owners] + dy[owners] * t_end
+            ray, box = self.rect_candidates(
+                level, owners,
+                np.minimum(start_x, end_x), np.minimum(start_y, end_y),
+                np.maximum(start_x, end_x), np.maximum(start_y, end_y)
+            )
+            ray_parts.append(ray)
+            box_parts.append(box)
+
+        ray, box = self.joined(ray_parts, box_parts)
+
+        # Exact segment/box test (slab method), clipped to the segment
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_enter, t_exit = self.slab(x0[ray], dx[ray], self.left[box], self.right[box])
+            t_enter_y, t_exit_y = self.slab(y0[ray], dy[ray], self.top[box], self.bottom[box])
+        t_enter = np.maximum(np.maximum(t_enter, t_enter_y), 0.0)
+        t_exit = np.minimum(np.minimum(t_exit, t_exit_y), 1.0)
+        hit = t_enter <= t_exit
+        ray, box, t_enter = ray[hit], box[hit], t_enter[hit]
+
+        # Sort by ray and distance, then drop repeats (neighboring pieces of a ray share cells)
+        order = np.lexsort((box, t_enter, ray))
+        ray, box, t_enter = ray[order], box[order], t_enter[order]
+        first = np.ones(len(ray), dtype=bool)
+        first[1:] = (ray[1:] != ray[:-1]) | (box[1:] != box[:-1])
+        return ray[first], box[first], t_enter[first]
+
+    @staticmethod
+    def slab(start, delta, low, high):
+        """Return the (enter, exit) t range of a segment along one axis between low and high"""
+        t_low = (low - start) / delta
+        t_high = (high - start) / delta
+        parallel = delta == 0
+        inside = (start >= low) & (start <= high)
+        enter = np.where(parallel, np.where(inside, -math.inf, math.inf), np.minimum(t_low, t_high))
+        exit = np.where(parallel, np.where(inside, math.inf, -math.inf), np.maximum(t_low, t_high))
+        return enter, exit
+
+    @staticmethod
+    def joined(first_parts, second_parts):
+        """Concatenate per-level results (two empty id arrays when there are none)"""
+        if not first_parts:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        return np.concatenate(first_parts), np.concatenate(second_parts)
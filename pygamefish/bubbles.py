@@ -0,0 +1,252 @@
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+from spatial import SpatialGrid
+
+class BubbleField:
+    """Background bubbles stored as contiguous NumPy arrays and updated in one batched step"""
+    MIN_SIZE = 8
+    MAX_SIZE = 25
+    MIN_ALPHA = 80
+    MAX_ALPHA = 150
+    INTERACTION_SCALE = 3  # Cursor interaction radius is size * 3
+
+    def __init__(self, count, width, height, rng=None):
+        # Random generator (can be seeded for reproducible runs)
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.count = 0
+
+        # Spatial index so cursor queries only visit nearby cells
+        self.max_radius = self.MAX_SIZE * self.INTERACTION_SCALE
+        self.grid = SpatialGrid(self.max_radius)
+        self.spawn(count, width, height)
+
+    def spawn(self, count, width, height):
+        """Create a fresh set of bubbles scattered over the given area"""
+        rng = self.rng
+        self.count = count
+
+        # Position and size
+        self.x = rng.integers(0, width + 1, count).astype(np.float64)
+        self.y = rng.integers(0, height + 1, count).astype(np.float64)
+        self.size = rng.integers(self.MIN_SIZE, self.MAX_SIZE + 1, count)
+
+        # Upward speed each bubble returns to after cursor interaction
+        self.rise_speed = rng.uniform(0.3, 1.5, count)
+
+        # Velocity from cursor interaction
+        self.vel_x = np.zeros(count)
+        self.vel_y = np.zeros(count)
+
+        # Individual transparency
+        self.alpha = rng.integers(self.MIN_ALPHA, self.MAX_ALPHA + 1, count)
+
+        # Slight horizontal wobble for natural movement
+        self.wobble = rng.uniform(0, 6.28, count)
+        self.wobble_speed = rng.uniform(0.02, 0.05, count)
+
+        self.grid.rebuild(self.x, self.y)
+
+    def __len__(self):
+        return self.count
+
+    def update(self, mouse_x, mouse_y, width, height):
+        """Advance every bubble by one frame, returns True if the cursor pushed a bubble hard"""
+        if self.count == 0:
+            return False
+
+        bubble_affected = False
+
+        # Only bubbles within their interaction radius of the cursor are pushed away
+        near, distance, dx, dy = self.near_cursor(mouse_x, mouse_y)
+        off_center = distance > 0
+        near, distance, dx, dy = near[off_center], distance[off_center], dx[off_center], dy[off_center]
+        if near.size:
+            near_radius = self.size[near] * self.INTERACTION_SCALE
+
+            # Repulsion force, limited to a max strength
+            force_strength = (near_radius - distance) / near_radius
+            force_strength = np.minimum(force_strength * 8, 15)
+
+            # Apply force along the normalized direction vector
+            self.vel_x[near] += dx / distance * force_strength * 0.3
+            self.vel_y[near] += dy / distance * force_strength * 0.3
+
+            # A bubble counts as affected if the force is significant
+            bubble_affected = bool((force_strength > 2).any())
+
+        # Apply some damping to velocities
+        self.vel_x *= 0.95
+        self.vel_y *= 0.95
+
+        # Add slight horizontal wobble for natural movement
+        self.wobble += self.wobble_speed
+        wobble_offset = np.sin(self.wobble) * 0.5
+
+        # Upward movement + interaction forces + wobble
+        self.x += self.vel_x + wobble_offset
+        self.y += self.vel_y - self.rise_speed
+
+        # Keep bubbles on screen horizontally
+        off_left = self.x < -self.size
+        off_right = self.x > width + self.size
+        self.x[off_left] = width + self.size[off_left]
+        self.x[off_right] = -self.size[off_right]
+
+        # Respawn bubbles at the bottom when they go off the top
+        off_top = np.flatnonzero(self.y < -self.size)
+        if off_top.size:
+            self.y[off_top] = height + self.size[off_top]
+            self.x[off_top] = self.rng.integers(0, width + 1, off_top.size)
+            self.vel_x[off_top] = 0.0
+            self.vel_y[off_top] = 0.0
+
+        # Re-bucket bubbles at their new positions
+        self.grid.rebuild(self.x, self.y)
+
+        return bubble_affected
+
+    def near_cursor(self, mouse_x, mouse_y):
+        """Return (indices, distance, dx, dy) for bubbles inside their interaction radius"""
+        # Candidates come from the grid cells around the cursor only
+        candidates = self.grid.query_radius(mouse_x, mouse_y, self.max_radius)
+        dx = self.x[candidates] - mouse_x
+        dy = self.y[candidates] - mouse_y
+        distance = np.hypot(dx, dy)
+        inside = distance < self.size[candidates] * self.INTERACTION_SCALE
+        return candidates[inside], distance[inside], dx[inside], dy[inside]
+
+    def proximity(self, mouse_x, mouse_y):
+        """Return (indices, factor) for bubbles near the cursor (factor 1 = at the cursor, 0 = at the radius)"""
+        near, distance, _, _ = self.near_cursor(mouse_x, mouse_y)
+        return near, 1 - distance / (self.size[near] * self.INTERACTION_SCALE)
+
+class BubbleSpriteCache:
+    """Pre-rendered bubble sprites keyed by (size, quantized alpha, quantized tint) with LRU eviction
+
+    The tint (cursor proximity) also sets how much brighter a bubble near the cursor is drawn,
+    so every key comes from a bubble's size and alpha plus one of TINT_LEVELS + 1 tints. The
+    default limit holds that whole key space, so once every sprite was drawn nothing is evicted
+    and frames allocate no surfaces.
+    """
+    ALPHA_STEP = 8  # Alpha values are rounded down to multiples of this
+    TINT_LEVELS = 8  # Number of cursor-proximity tint steps
+    NEAR_BRIGHTENING = 100  # Alpha added at full proximity
+
+    def __init__(self, max_sprites=None):
+        self.sprites = OrderedDict()
+        self.max_sprites = max_sprites if max_sprites is not None else len(self.key_space())
+
+        # Counters so we can check that steady-state frames allocate nothing
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key_space(self, sizes=None, alphas=None):
+        """Return every (size, alpha, tint) key bubbles can use (all bubble sizes and alphas by default)"""
+        if sizes is None:
+            sizes = range(BubbleField.MIN_SIZE, BubbleField.MAX_SIZE + 1)
+        if alphas is None:
+            alphas = range(BubbleField.MIN_ALPHA, BubbleField.MAX_ALPHA + 1)
+        levels = sorted({alpha // self.ALPHA_STEP * self.ALPHA_STEP for alpha in alphas})
+        return [(size, alpha, tint) for size in sizes for alpha in levels for tint in range(self.TINT_LEVELS + 1)]
+
+    def prerender(self, field):
+        """Render every sprite the field's bubbles can use, so later frames never miss"""
+        for key in self.key_space(np.unique(field.size).tolist(), np.unique(field.alpha).tolist()):
+            self.get(*key)
+
+    def sprite_keys(self, field, near, proximity):
+        """Return quantized (alpha, tint) arrays for every bubble, the tint is how close to the cursor it is"""
+        alpha = field.alpha // self.ALPHA_STEP * self.ALPHA_STEP
+        tint = np.zeros(len(field), dtype=np.int64)
+        if near.size:
+            tint[near] = np.rint(proximity * self.TINT_LEVELS).astype(np.int64)
+        return alpha, tint
+
+    def get(self, size, alpha, tint):
+        """Return the sprite for a bubble, rendering it only on a cache miss"""
+        key = (size, alpha, tint)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+            self.sprites.move_to_end(key)
+            return sprite
+
+        self.misses += 1
+        sprite = self.render(size, alpha, tint)
+        self.sprites[key] = sprite
+
+        # Drop the least recently used sprite when over the limit
+        if len(self.sprites) > self.max_sprites:
+            self.sprites.popitem(last=False)
+            self.evictions += 1
+        return sprite
+
+    def render(self, size, alpha, tint):
+        """Draw a single bubble sprite"""
+        proximity_factor = tint / self.TINT_LEVELS
+        alpha = min(255, alpha + int(proximity_factor * self.NEAR_BRIGHTENING))
+        color = (
+            min(255, int(200 + proximity_factor * 55)),
+            min(255, int(220 + proximity_factor * 35)),
+            255
+        )
+
+        # Create a surface for the bubble with transparency
+        bubble_surface = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+
+        # Draw outer bubble (main bubble)
+        pygame.draw.circle(bubble_surface, (*color, alpha), (size, size), size)
+
+        # Draw inner highlight for 3D effect
+        highlight_size = max(2, size // 3)
+        highlight_offset = size // 4
+        pygame.draw.circle(
+            bubble_surface,
+            (255, 255, 255, min(100, alpha // 2)),
+            (size - highlight_offset, size - highlight_offset),
+            highlight_size
+        )
+
+        # Match the display pixel format for faster blits
+        if pygame.display.get_surface() is not None:
+            bubble_surface = bubble_surface.convert_alpha()
+        return bubble_surface
+
+    def draw(self, surface, field, near, proximity):
+        """Blit every bubble in the field using cached sprites"""
+        alpha, tint = self.sprite_keys(field, near, proximity)
+        size = field.size.tolist()
+        left = (field.x - field.size).astype(np.int64).tolist()
+        top = (field.y - field.size).astype(np.int64).tolist()
+
+        get = self.get
+        surface.blits(
+            [
+                (get(s, a, t), (x, y))
+                for s, a, t, x, y in zip(size, alpha.tolist(), tint.tolist(), left, top)
+            ],
+            doreturn=False
+        )
+
+    def stats(self):
+        """Return cache counters"""
+        return {
+            'sprites': len(self.sprites),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+    def reset_stats(self):
+        """Reset hit/miss counters"""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def clear(self):
+        """Drop all cached sprites"""
+        self.sprites.clear()
@@ -0,0 +1,171 @@
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+# World chunks are square tiles of this many pixels
+CHUNK_SIZE = 512
+
+# Water color at the surface and at the bottom of the world
+SURFACE_COLOR = (20, 60, 110)
+DEPTH_COLOR = (5, 15, 40)
+SAND_COLOR = (150, 130, 90)
+ROCK_COLOR = (70, 70, 80)
+WEED_COLOR = (30, 110, 60)
+
+# Height of the seabed strip at the bottom of the world
+SEABED_HEIGHT = 160
+
+class Camera:
+    """Viewport onto the world that centers on a target, clamped to the world edges"""
+    def __init__(self, view_width, view_height, world_width, world_height):
+        self.view_width = view_width
+        self.view_height = view_height
+        self.world_width = world_width
+        self.world_height = world_height
+
+        # Top-left corner of the view in world pixels
+        self.x = 0
+        self.y = 0
+
+    def resize(self, view_width, view_height):
+        """Match a new window size"""
+        self.view_width = view_width
+        self.view_height = view_height
+
+    def follow(self, target_x, target_y):
+        """Center the view on a world position, returns True if the view moved"""
+        old = (self.x, self.y)
+        self.x = self.clamp(int(target_x) - self.view_width // 2, self.world_width - self.view_width)
+        self.y = self.clamp(int(target_y) - self.view_height // 2, self.world_height - self.view_height)
+        return (self.x, self.y) != old
+
+    @staticmethod
+    def clamp(value, limit):
+        """Clamp a view offset to [0, limit], or center the world when it is smaller than the view"""
+        if limit < 0:
+            return limit // 2
+        return max(0, min(limit, value))
+
+    def rect(self, margin=0):
+        """Return the view as (left, top, right, bottom) in world pixels, grown by margin"""
+        return (
+            self.x - margin, self.y - margin,
+            self.x + self.view_width + margin, self.y + self.view_height + margin
+        )
+
+class ChunkMap:
+    """World background split into CHUNK_SIZE tiles, generated on first use and kept in an LRU cache
+
+    Only chunks overlapping the view are drawn (and generated if missing), so the world size
+    doesn't change per-frame cost. When the cache grows past max_bytes, the least recently used
+    chunks that aren't on screen are evicted and regenerated if they come back into view.
+    """
+    def __init__(self, world_width, world_height, seed=0, chunk_size=CHUNK_SIZE, max_bytes=64 * 1024 * 1024):
+        self.world_width = world_width
+        self.world_height = world_height
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.max_bytes = max_bytes
+        self.cols = -(-world_width // chunk_size)
+        self.rows = -(-world_height // chunk_size)
+
+        # (col, row) -> Surface, least recently used first
+        self.chunks = OrderedDict()
+
+        # Counters
+        self.generated = 0
+        self.evictions = 0
+
+    def chunk_range(self, left, top, right, bottom):
+        """Return the (cols, rows) ranges of chunks overlapping a world rectangle"""
+        size = self.chunk_size
+        first_col = max(int(left) // size, 0)
+        last_col = min((int(right) - 1) // size, self.cols - 1)
+        first_row = max(int(top) // size, 0)
+        last_row = min((int(bottom) - 1) // size, self.rows - 1)
+        return range(first_col, last_col + 1), range(first_row, last_row + 1)
+
+    def get(self, col, row):
+        """Return a chunk's surface, generating it on first use"""
+        key = (col, row)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.generate(col, row)
+            self.chunks[key] = chunk
+            self.generated += 1
+        else:
+            self.chunks.move_to_end(key)
+        return chunk
+
+    def generate(self, col, row):
+        """Render one chunk (water depth gradient, particles, seabed), the same every time for a seed"""
+        size = self.chunk_size
+        chunk = pygame.Surface((size, size))
+        if pygame.display.get_surface() is not None:
+            chunk = chunk.convert()
+        rng = np.random.default_rng((self.seed, col, row))
+        top = row * size
+
+        # Depth gradient in 16 pixel bands
+        for band in range(0, size, 16):
+            depth = min((top + band) / max(self.world_height, 1), 1.0)
+            color = [int(a + (b - a) * depth) for a, b in zip(SURFACE_COLOR, DEPTH_COLOR)]
+            chunk.fill(color, (0, band, size, 16))
+
+        # Floating particles
+        for x, y in rng.integers(0, size, (24, 2)).tolist():
+            chunk.fill((60, 90, 130), (x, y, 2, 2))
+
+        # Seabed with rocks and weeds along the bottom of the world
+        seabed_top = self.world_height - SEABED_HEIGHT - top
+        if seabed_top < size:
+            chunk.fill(SAND_COLOR, (0, seabed_top, size, size - seabed_top))
+            for x, radius in zip(rng.integers(0, size, 4).tolist(), rng.integers(10, 30, 4).tolist()):
+                pygame.draw.circle(chunk, ROCK_COLOR, (x, seabed_top + radius // 2), radius)
+            for x, height in zip(rng.integers(0, size, 10).tolist(), rng.integers(30, 90, 10).tolist()):
+                pygame.draw.line(chunk, WEED_COLOR, (x, seabed_top), (x + 4, seabed_top - height), 3)
+        return chunk
+
+    def chunk_bytes(self):
+        """Memory held by one chunk"""
+        return self.chunk_size * self.chunk_size * 4
+
+    def draw(self, surface, camera):
+        """Blit the chunks under the whole surface, placed at the camera's position"""
+        width, height = surface.get_size()
+        cols, rows = self.chunk_range(camera.x, camera.y, camera.x + width, camera.y + height)
+        size = self.chunk_size
+        blit_sequence = []
+        visible = set()
+        for row in rows:
+            for col in cols:
+                visible.add((col, row))
+                blit_sequence.append((self.get(col, row), (col * size - camera.x, row * size - camera.y)))
+
+        # Fill anything outside the world (world smaller than the window)
+        if camera.x < 0 or camera.y < 0 or camera.x + width > self.world_width or camera.y + height > self.world_height:
+            surface.fill(DEPTH_COLOR)
+        surface.blits(blit_sequence, doreturn=False)
+
+        self.evict(visible)
+
+    def evict(self, keep):
+        """Drop least recently used chunks while over the memory cap (never ones in keep)"""
+        chunk_bytes = self.chunk_bytes()
+        for key in list(self.chunks):
+            if len(self.chunks) * chunk_bytes <= self.max_bytes:
+                break
+            if key in keep:
+                continue
+            del self.chunks[key]
+            self.evictions += 1
+
+    def stats(self):
+        """Return cache counters"""
+        return {
+            'chunks': len(self.chunks),
+            'bytes': len(self.chunks) * self.chunk_bytes(),
+            'generated': self.generated,
+            'evictions': self.evictions
+        }
@@ -0,0 +1,165 @@
+import numpy as np
+
+# Entity kinds
+KIND_PLAYER = 0
+KIND_FISH = 1
+
+class EntityStore:
+    """Entities stored as NumPy columns (position, velocity, size, kind) and updated in batched passes
+
+    Entities are identified by their slot index. Removed slots are reused by later spawns, so ids
+    stay valid for as long as the entity lives. Capacity doubles when full, so spawning is
+    amortized O(1) per entity.
+    """
+    COLUMNS = (
+        ('x', np.float64), ('y', np.float64),
+        ('prev_x', np.float64), ('prev_y', np.float64),  # Position at the previous tick (for interpolation)
+        ('vel_x', np.float64), ('vel_y', np.float64),    # Pixels per tick
+        ('width', np.int32), ('height', np.int32),
+        ('speed', np.float64),
+        ('kind', np.int8),
+        ('alive', np.bool_)
+    )
+
+    def __init__(self, capacity=64):
+        self.capacity = 0
+        self.count = 0  # Slots in use so far (alive or free), every column is valid up to here
+        self.free = []
+        self.allocate(capacity)
+
+    def allocate(self, capacity):
+        """Grow every column to a new capacity, keeping existing entities"""
+        for name, dtype in self.COLUMNS:
+            column = np.zeros(capacity, dtype=dtype)
+            if self.capacity:
+                column[:self.capacity] = getattr(self, name)
+            setattr(self, name, column)
+        self.capacity = capacity
+
+    def reserve(self, count):
+        """Make room for count more slots"""
+        needed = self.count + count
+        if needed > self.capacity:
+            capacity = max(self.capacity, 1)
+            while capacity < needed:
+                capacity *= 2
+            self.allocate(capacity)
+
+    def spawn(self, kind, x, y, width, height, vel_x=0.0, vel_y=0.0, speed=0.0):
+        """Add one entity, returns its id"""
+        if self.free:
+            slot = self.free.pop()
+        else:
+            self.reserve(1)
+            slot = self.count
+            self.count += 1
+
+        self.x[slot] = self.prev_x[slot] = x
+        self.y[slot] = self.prev_y[slot] = y
+        self.vel_x[slot] = vel_x
+        self.vel_y[slot] = vel_y
+        self.width[slot] = width
+        self.height[slot] = height
+        self.speed[slot] = speed
+        self.kind[slot] = kind
+        self.alive[slot] = True
+        return slot
+
+    def spawn_many(self, kind, x, y, width, height, vel_x=0.0, vel_y=0.0, speed=0.0):
+        """Add a batch of entities from arrays (scalars broadcast), returns their ids"""
+        x = np.asarray(x, dtype=np.float64)
+        count = len(x)
+
+        # Reuse free slots first, append the rest
+        split = max(len(self.free) - count, 0)
+        reused = self.free[split:]
+        del self.free[split:]
+        appended = count - len(reused)
+        self.reserve(appended)
+        ids = np.concatenate([np.array(reused, dtype=np.int64), np.arange(self.count, self.count + appended)])
+        self.count += appended
+
+        self.x[ids] = self.prev_x[ids] = x
+        self.y[ids] = self.prev_y[ids] = y
+        self.vel_x[ids] = vel_x
+        self.vel_y[ids] = vel_y
+        self.width[ids] = width
+        self.height[ids] = height
+        self.speed[ids] = speed
+        self.kind[ids] = kind
+        self.alive[ids] = True
+        return ids
+
+    def remove(self, ids):
+        """Remove entities, their slots are reused by later spawns"""
+        ids = np.atleast_1d(ids)
+        ids = ids[self.alive[ids]]
+        self.alive[ids] = False
+        self.free.extend(ids.tolist())
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive[:self.count]))
+
+    def ids(self, kind=None):
+        """Return the ids of living entities, optionally of one kind only"""
+        mask = self.alive[:self.count]
+        if kind is not None:
+            mask = mask & (self.kind[:self.count] == kind)
+        return np.flatnonzero(mask)
+
+    def step(self, ids=None, ticks=1):
+        """Advance entities by simulation ticks along their velocity (remembering the old position)"""
+        if ids is None:
+            ids = slice(0, self.count)
+        self.prev_x[ids] = self.x[ids]
+        self.prev_y[ids] = self.y[ids]
+        self.x[ids] += self.vel_x[ids] * ticks
+        self.y[ids] += self.vel_y[ids] * ticks
+
+    def confine(self, width, height, ids=None):
+        """Keep entities fully inside a width x height area"""
+        if ids is None:
+            ids = slice(0, self.count)
+        half_width = self.width[ids] // 2
+        half_height = self.height[ids] // 2
+        self.x[ids] = np.clip(self.x[ids], half_width, width - half_width)
+        self.y[ids] = np.clip(self.y[ids], half_height, height - half_height)
+
+    def cull(self, left, top, right, bottom, kind=None):
+        """Return ids of living entities whose bounds overlap a rectangle (e.g. the visible screen)"""
+        n = self.count
+        half_width = self.width[:n] / 2
+        half_height = self.height[:n] / 2
+        mask = (
+            self.alive[:n]
+            & (self.x[:n] + half_width >= left) & (self.x[:n] - half_width < right)
+            & (self.y[:n] + half_height >= top) & (self.y[:n] - half_height < bottom)
+        )
+        if kind is not None:
+            mask &= self.kind[:n] == kind
+        return np.flatnonzero(mask)
+
+    def bounds(self, ids):
+        """Return (left, top, right, bottom) arrays of entity boxes (e.g. to build a broadphase)"""
+        half_width = self.width[ids] / 2
+        half_height = self.height[ids] / 2
+        return self.x[ids] - half_width, self.y[ids] - half_height, self.x[ids] + half_width, self.y[ids] + half_height
+
+    def interpolated(self, ids, interpolation):
+        """Return (x, y) arrays blended between the previous tick (0.0) and the current tick (1.0)"""
+        x = self.prev_x[ids] + (self.x[ids] - self.prev_x[ids]) * interpolation
+        y = self.prev_y[ids] + (self.y[ids] - self.prev_y[ids]) * interpolation
+        return x, y
+
+class EntityField:
+    """Attribute on an entity view that reads and writes one column of its store"""
+    def __init__(self, column):
+        self.column = column
+
+    def __get__(self, view, owner=None):
+        if view is None:
+            return self
+        return getattr(view.store, self.column)[view.entity_id].item()
+
+    def __set__(self, view, value):
+        getattr(view.store, self.column)[view.entity_id] = value
@@ -0,0 +1,199 @@
+import math
+
+import numpy as np
+import pygame
+
+from entities import KIND_FISH
+from spatial import SpatialGrid
+
+class FishSchool:
+    """Flocking fish (separation, alignment, cohesion) that flee the player, stored in an EntityStore
+
+    Neighbors come from uniform grids. Alignment and cohesion use every fish in the 3x3 cells
+    around a fish (summed per cell, so O(fish + cells) even inside a dense school), separation
+    uses the exact pairs closer than SEPARATION_RADIUS. Every rule is a vectorized pass.
+    Distances and velocities are in pixels and pixels per simulation tick.
+    """
+    NEIGHBOR_CELL = 30
+    SEPARATION_RADIUS = 12
+    FLEE_RADIUS = 150
+
+    # Steering weights
+    ALIGNMENT = 0.05
+    COHESION = 0.004
+    SEPARATION = 1.2
+    FLEE = 0.6
+    EDGE_TURN = 0.25
+    EDGE_MARGIN = 40
+
+    MIN_SPEED = 1.0
+    MAX_SPEED = 3.0
+
+    FISH_WIDTH = 14
+    FISH_HEIGHT = 6
+
+    def __init__(self, store, count, width, height, rng=None):
+        # Random generator (can be seeded for reproducible runs)
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.store = store
+        self.grid = SpatialGrid(self.NEIGHBOR_CELL)
+        self.separation_grid = SpatialGrid(self.SEPARATION_RADIUS)
+        self.ids = np.empty(0, dtype=np.int64)
+
+        # Sprites are made on the first draw (a simulation-only school never needs them)
+        self.sprites = None
+        self.spawn(count, width, height)
+
+    def spawn(self, count, width, height):
+        """Add fish scattered over the area, swimming in random directions"""
+        return self.add(self.rng.uniform(0, width, count), self.rng.uniform(0, height, count))
+
+    def add(self, x, y):
+        """Add fish at positions, swimming in random directions, returns their ids"""
+        rng = self.rng
+        count = len(x)
+        heading = rng.uniform(0, 2 * math.pi, count)
+        speed = rng.uniform(self.MIN_SPEED, self.MAX_SPEED, count)
+        ids = self.store.spawn_many(
+            KIND_FISH, x, y,
+            self.FISH_WIDTH, self.FISH_HEIGHT,
+            vel_x=np.cos(heading) * speed, vel_y=np.sin(heading) * speed,
+            speed=speed
+        )
+        self.ids = np.concatenate([self.ids, ids])
+        return ids
+
+    def remove(self, ids):
+        """Remove fish from the school and the store"""
+        self.store.remove(ids)
+        self.ids = self.ids[~np.isin(self.ids, ids)]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def steer(self, player_x, player_y, width, height, ids=None):
+        """Set every fish's velocity (or only ids') for the next tick (the store's step() then moves them)"""
+        if ids is None:
+            ids = self.ids
+        count = len(ids)
+        if count == 0:
+            return
+
+        store = self.store
+        x = store.x[ids]
+        y = store.y[ids]
+        vel_x = store.vel_x[ids]
+        vel_y = store.vel_y[ids]
+
+        # Neighbor counts and sums over the surrounding cells, minus the fish itself
+        grid = self.grid
+        grid.rebuild(x, y)
+        neighbors = grid.neighborhood_sums() - 1
+        sum_x = grid.neighborhood_sums(x) - x
+        sum_y = grid.neighborhood_sums(y) - y
+        sum_vel_x = grid.neighborhood_sums(vel_x) - vel_x
+        sum_vel_y = grid.neighborhood_sums(vel_y) - vel_y
+
+        has_neighbors = neighbors > 0
+        divisor = np.maximum(neighbors, 1)
+
+        # Alignment: match the neighbors' average velocity
+        accel_x = np.where(has_neighbors, sum_vel_x / divisor - vel_x, 0.0) * self.ALIGNMENT
+        accel_y = np.where(has_neighbors, sum_vel_y / divisor - vel_y, 0.0) * self.ALIGNMENT
+
+        # Cohesion: move toward the neighbors' center
+        accel_x += np.where(has_neighbors, sum_x / divisor - x, 0.0) * self.COHESION
+        accel_y += np.where(has_neighbors, sum_y / divisor - y, 0.0) * self.COHESION
+
+        # Separation: push apart pairs that are too close, harder the closer they are
+        self.separation_grid.rebuild(x, y)
+        i, j, dx, dy, dist_sq = self.separation_grid.neighbor_pairs(x, y, self.SEPARATION_RADIUS)
+        push = self.SEPARATION / np.maximum(dist_sq, 1.0)
+        push_x = dx * push
+        push_y = dy * push
+        accel_x += np.bincount(i, push_x, count) - np.bincount(j, push_x, count)
+        accel_y += np.bincount(i, push_y, count) - np.bincount(j, push_y, count)
+
+        # Flee: swim away from the player, harder the closer it is
+        away_x = x - player_x
+        away_y = y - player_y
+        player_dist = np.sqrt(away_x * away_x + away_y * away_y)
+        fleeing = player_dist < self.FLEE_RADIUS
+        if fleeing.any():
+            strength = self.FLEE * (1.0 - player_dist[fleeing] / self.FLEE_RADIUS) / np.maximum(player_dist[fleeing], 1.0)
+            accel_x[fleeing] += away_x[fleeing] * strength
+            accel_y[fleeing] += away_y[fleeing] * strength
+
+        # Turn back before reaching the edges
+        margin = self.EDGE_MARGIN
+        accel_x += self.EDGE_TURN * ((x < margin).astype(np.float64) - (x > width - margin))
+        accel_y += self.EDGE_TURN * ((y < margin).astype(np.float64) - (y > height - margin))
+
+        # Keep speeds in range
+        vel_x += accel_x
+        vel_y += accel_y
+        speed = np.sqrt(vel_x * vel_x + vel_y * vel_y)
+        limited = np.clip(speed, self.MIN_SPEED, self.MAX_SPEED) / np.maximum(speed, 1e-9)
+        store.vel_x[ids] = vel_x * limited
+        store.vel_y[ids] = vel_y * limited
+
+    def confine(self, width, height, ids=None):
+        """Keep every fish (or only ids) inside the area (after a resize or a hard push)"""
+        self.store.confine(width, height, self.ids if ids is None else ids)
+
+    def draw(self, surface, interpolation=1.0, camera=None):
+        """Blit the fish that are on screen (under the camera, if given), returns the rects that were drawn"""
+        store = self.store
+        if camera is not None:
+            visible = store.cull(*camera.rect(), KIND_FISH)
+        else:
+            width, height = surface.get_size()
+            visible = store.cull(0, 0, width, height, KIND_FISH)
+        if len(visible) == 0:
+            return []
+
+        if self.sprites is None:
+            self.sprites = FishSprites()
+        x, y = store.interpolated(visible, interpolation)
+        if camera is not None:
+            x -= camera.x
+            y -= camera.y
+        return self.sprites.draw(surface, x, y, store.vel_x[visible], store.vel_y[visible], visible)
+
+class FishSprites:
+    """Pre-rotated fish sprites per heading and color, blitted in one batch"""
+    HEADINGS = 32
+    COLORS = ((255, 150, 60), (200, 210, 220), (255, 210, 80))
+
+    def __init__(self):
+        # Sprite for every (color, heading), at index color * HEADINGS + heading, and the offset
+        # from the fish center to each sprite's top-left corner
+        self.sprites = []
+        for color in self.COLORS:
+            base = self.render(color)
+            for heading in range(self.HEADINGS):
+                sprite = pygame.transform.rotate(base, -360.0 * heading / self.HEADINGS)
+                if pygame.display.get_surface() is not None:
+                    sprite = sprite.convert_alpha()
+                self.sprites.append(sprite)
+        self.offset_x = np.array([-sprite.get_width() // 2 for sprite in self.sprites])
+        self.offset_y = np.array([-sprite.get_height() // 2 for sprite in self.sprites])
+
+    def render(self, color):
+        """Draw one fish facing right"""
+        width = FishSchool.FISH_WIDTH
+        height = FishSchool.FISH_HEIGHT
+        sprite = pygame.Surface((width, height), pygame.SRCALPHA)
+        pygame.draw.ellipse(sprite, color, (0, 0, width - 4, height))
+        pygame.draw.polygon(sprite, color, ((width - 5, height // 2), (width - 1, 0), (width - 1, height - 1)))
+        return pygame.transform.flip(sprite, True, False)
+
+    def draw(self, surface, x, y, vel_x, vel_y, ids):
+        """Blit fish at (x, y) facing along their velocity, colors picked by entity id"""
+        headings = np.rint(np.arctan2(vel_y, vel_x) * (self.HEADINGS / (2 * math.pi))).astype(np.int64) % self.HEADINGS
+        index = (ids % len(self.COLORS)) * self.HEADINGS + headings
+        left = (x.astype(np.int64) + self.offset_x[index]).tolist()
+        top = (y.astype(np.int64) + self.offset_y[index]).tolist()
+
+        sprites = self.sprites
+        return surface.blits(list(zip([sprites[i] for i in index.tolist()], zip(left, top))))
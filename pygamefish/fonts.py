@@ -0,0 +1,50 @@
+from collections import OrderedDict
+
+import pygame
+
+class FontRegistry:
+    """Hands out shared Font objects keyed by (face, pixel size), least recently used dropped past max_fonts
+
+    Dragging a window resize asks for a font at every intermediate size, so only the sizes in
+    recent use are kept (a few per scale, the current scale's always among them).
+    """
+    def __init__(self, max_fonts=32):
+        self.fonts = OrderedDict()
+        self.max_fonts = max_fonts
+
+        # Counters (loads == Font constructions)
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, face, size):
+        """Return the font for a face (None = default font) at a pixel size"""
+        key = (face, int(size))
+        font = self.fonts.get(key)
+        if font is not None:
+            self.hits += 1
+            self.fonts.move_to_end(key)
+            return font
+
+        self.loads += 1
+        font = pygame.font.Font(face, key[1])
+        self.fonts[key] = font
+        if len(self.fonts) > self.max_fonts:
+            self.fonts.popitem(last=False)
+            self.evictions += 1
+        return font
+
+    def clear(self):
+        """Drop every cached font"""
+        self.fonts.clear()
+
+    def stats(self):
+        """Return registry counters"""
+        return {'fonts': len(self.fonts), 'hits': self.hits, 'loads': self.loads, 'evictions': self.evictions}
+
+# Shared registry used by scale_fonts and anything else that needs a font
+font_registry = FontRegistry()
+
+def get_font(face, size):
+    """Get a font from the shared registry"""
+    return font_registry.get(face, size)
@@ -0,0 +1,260 @@
+import csv
+import json
+import os
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pygame
+
+from fonts import get_font
+
+# Top-level phases of a frame, in loop order (anything else recorded is a sub-phase inside one of them)
+PHASES = ('events', 'update', 'draw', 'flip', 'tick')
+
+DEFAULT_CSV_PATH = 'frame_stats.csv'
+DEFAULT_JSON_PATH = 'frame_stats.json'
+
+class FrameStats:
+    """Ring buffer of per-phase frame timings (ms) for the last `capacity` frames
+
+    A loop calls begin_frame(), then mark(phase) as each top-level phase ends, and end_frame().
+    Sub-phases (bubbles, widgets, text renders...) are timed with section() or add() and are
+    summed per frame. Calls outside a frame are ignored.
+    """
+    def __init__(self, capacity=4096, enabled=True):
+        self.capacity = capacity
+        self.enabled = enabled
+
+        # Column per phase name, in the order they were first seen ('total' is the whole frame)
+        self.columns = {'total': 0}
+        for phase in PHASES:
+            self.columns[phase] = len(self.columns)
+        self.samples = np.zeros((capacity, len(self.columns) + 8), dtype=np.float32)
+
+        # Scene each frame belongs to (index into self.scenes)
+        self.scenes = []
+        self.frame_scenes = np.zeros(capacity, dtype=np.int16)
+
+        # Frames recorded in total (the next row is frame_count % capacity)
+        self.frame_count = 0
+
+        # Frame in progress
+        self.current = {}
+        self.scene = None
+        self.frame_start = None
+        self.mark_time = None
+
+    def begin_frame(self, scene):
+        """Start timing a frame of a scene ('menu', 'game', ...)"""
+        if not self.enabled:
+            return
+        self.current.clear()
+        self.scene = scene
+        self.frame_start = self.mark_time = time.perf_counter()
+
+    def mark(self, phase):
+        """End a top-level phase (it ran since the previous mark or begin_frame)"""
+        if self.frame_start is None:
+            return
+        now = time.perf_counter()
+        self.current[phase] = self.current.get(phase, 0.0) + now - self.mark_time
+        self.mark_time = now
+
+    def add(self, phase, seconds):
+        """Add time to a sub-phase of the current frame"""
+        if self.frame_start is None:
+            return
+        self.current[phase] = self.current.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def section(self, phase):
+        """Time a block as a sub-phase of the current frame"""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start_time)
+
+    def cancel_frame(self):
+        """Drop the frame in progress (e.g. the menu frame that ran a whole game session)"""
+        self.frame_start = None
+
+    def end_frame(self):
+        """Store the frame in progress in the ring buffer"""
+        if self.frame_start is None:
+            return
+        self.current['total'] = time.perf_counter() - self.frame_start
+        self.frame_start = None
+
+        row = self.frame_count % self.capacity
+        samples = self.samples
+        samples[row] = 0.0
+        for phase, seconds in self.current.items():
+            column = self.columns.get(phase)
+            if column is None:
+                column = self.add_column(phase)
+                samples = self.samples
+            samples[row, column] = seconds * 1000
+
+        if self.scene not in self.scenes:
+            self.scenes.append(self.scene)
+        self.frame_scenes[row] = self.scenes.index(self.scene)
+        self.frame_count += 1
+
+    def add_column(self, phase):
+        """Give a newly seen phase a column, growing the buffer when it is full"""
+        column = len(self.columns)
+        self.columns[phase] = column
+        if column >= self.samples.shape[1]:
+            self.samples = np.pad(self.samples, ((0, 0), (0, 8)))
+        return column
+
+    def __len__(self):
+        return min(self.frame_count, self.capacity)
+
+    def recent(self, frames=None):
+        """Return (samples, scene indices) of the most recent frames, oldest first"""
+        count = len(self) if frames is None else min(frames, len(self))
+        end = self.frame_count % self.capacity
+        rows = (np.arange(end - count, end) % self.capacity) if count else np.arange(0)
+        return self.samples[rows, :len(self.columns)], self.frame_scenes[rows]
+
+    def summary(self, frames=None):
+        """Return mean/p50/p95/p99/max in ms per phase over the recent frames"""
+        samples, _ = self.recent(frames)
+        if not len(samples):
+            return {}
+
+        summary = {}
+        for phase, column in self.columns.items():
+            values = samples[:, column]
+            summary[phase] = {
+                'mean_ms': float(values.mean()),
+                'p50_ms': float(np.percentile(values, 50)),
+                'p95_ms': float(np.percentile(values, 95)),
+                'p99_ms': float(np.percentile(values, 99)),
+                'max_ms': float(values.max())
+            }
+        return summary
+
+    def export_csv(self, path=DEFAULT_CSV_PATH):
+        """Write every buffered frame as a CSV row (one column per phase, ms)"""
+        samples, scenes = self.recent()
+        first_frame = self.frame_count - len(samples)
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['frame', 'scene'] + list(self.columns))
+            for i, row in enumerate(samples):
+                writer.writerow([first_frame + i, self.scenes[scenes[i]]] + [f"{value:.4f}" for value in row])
+        print(f"Frame stats written to {path}")
+
+    def export_json(self, path=DEFAULT_JSON_PATH):
+        """Write the summary and every buffered frame as JSON"""
+        samples, scenes = self.recent()
+        first_frame = self.frame_count - len(samples)
+        report = {
+            'frames_recorded': self.frame_count,
+            'phases': list(self.columns),
+            'summary': self.summary(),
+            'frames': [
+                dict({'frame': first_frame + i, 'scene': self.scenes[scenes[i]]},
+                     **{phase: round(float(row[column]), 4) for phase, column in self.columns.items()})
+                for i, row in enumerate(samples)
+            ]
+        }
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Frame stats written to {path}")
+
+    def export(self):
+        """Write both the CSV and JSON exports to their default paths"""
+        self.export_csv()
+        self.export_json()
+
+class FrameStatsOverlay:
+    """On-screen frame-time graph (stacked by top-level phase) and per-phase numbers"""
+    GRAPH_FRAMES = 240
+    GRAPH_HEIGHT = 100
+    GRAPH_MAX_MS = 33.3  # Top of the graph (two 60 FPS frames)
+    TEXT_INTERVAL = 500  # ms between refreshes of the numbers (so they stay readable)
+
+    PHASE_COLORS = {
+        'events': (255, 200, 60),
+        'update': (80, 220, 120),
+        'draw': (80, 160, 255),
+        'flip': (230, 90, 230),
+        'tick': (110, 110, 110)
+    }
+
+    def __init__(self):
+        self.visible = False
+        self.panel = None
+        self.text_surfaces = []
+        self.next_text_update = 0
+
+    def toggle(self):
+        """Show or hide the overlay"""
+        self.visible = not self.visible
+        self.next_text_update = 0
+
+    def draw(self, surface, stats):
+        """Draw the overlay in the top-right corner, returns the rect it covered (None when hidden)"""
+        if not self.visible:
+            return None
+
+        start_time = time.perf_counter()
+        now = pygame.time.get_ticks()
+        if now >= self.next_text_update:
+            self.update_text(stats)
+            self.next_text_update = now + self.TEXT_INTERVAL
+
+        width = self.GRAPH_FRAMES + 20
+        height = self.GRAPH_HEIGHT + 20 + sum(text.get_height() for text in self.text_surfaces)
+        if self.panel is None or self.panel.get_size() != (width, height):
+            self.panel = pygame.Surface((width, height))
+            self.panel.set_alpha(210)
+        panel = self.panel
+        panel.fill((0, 0, 0))
+
+        # Stacked bar per frame, oldest on the left
+        samples, _ = stats.recent(self.GRAPH_FRAMES)
+        scale = self.GRAPH_HEIGHT / self.GRAPH_MAX_MS
+        bottom = 10 + self.GRAPH_HEIGHT
+        x = 10 + self.GRAPH_FRAMES - len(samples)
+        for row in samples:
+            y = bottom
+            for phase, color in self.PHASE_COLORS.items():
+                bar = int(row[stats.columns[phase]] * scale)
+                if bar > 0:
+                    top = max(y - bar, 10)
+                    pygame.draw.line(panel, color, (x, y), (x, top))
+                    y = top
+            x += 1
+
+        # 60 FPS budget line
+        budget_y = bottom - int(1000 / 60 * scale)
+        pygame.draw.line(panel, (255, 60, 60), (10, budget_y), (10 + self.GRAPH_FRAMES, budget_y))
+
+        y = bottom + 5
+        for text in self.text_surfaces:
+            panel.blit(text, (10, y))
+            y += text.get_height()
+
+        rect = surface.blit(panel, (surface.get_width() - width - 10, 10))
+        stats.add('overlay.draw', time.perf_counter() - start_time)
+        return rect
+
+    def update_text(self, stats):
+        """Re-render the per-phase numbers (drawn straight from the font, they'd only churn the text cache)"""
+        font = get_font(None, 18)
+        summary = stats.summary(self.GRAPH_FRAMES)
+        self.text_surfaces = []
+        for phase, values in summary.items():
+            color = self.PHASE_COLORS.get(phase, (220, 220, 220))
+            line = f"{phase:<14} {values['mean_ms']:6.2f} ms  p95 {values['p95_ms']:6.2f}  max {values['max_ms']:6.2f}"
+            self.text_surfaces.append(font.render(line, True, color))
+
+# Shared recorder and overlay used by the menu and game loops (FISHGAME_FRAME_STATS=0 turns recording off)
+frame_stats = FrameStats(enabled=os.environ.get("FISHGAME_FRAME_STATS") != "0")
+stats_overlay = FrameStatsOverlay()
@@ -1,18 +1,89 @@
 import pygame
-import sys
 import os
+import time
 
-# Import from start_screen - add maximized to the imports
+import numpy as np
+
+# Import from start_screen (the window state is read when a game starts, see run_game)
 from start_screen import (
     current_width, current_height, screen, clock, FPS, WHITE, BLACK, BLUE, 
     RED, GREEN, LIGHT_GREEN, LIGHT_BLUE, GRAY, text_font, button_font, scale_fonts,
-    toggle_maximized, Button, maximized, MAX_WIDTH, MAX_HEIGHT, DEFAULT_WIDTH, DEFAULT_HEIGHT
+    toggle_maximized, Button, DEFAULT_WIDTH, DEFAULT_HEIGHT, window_state,
+    session_rng
 )
 
 from player import Player
+from entities import EntityStore
+from chunks import ChunkMap, Camera
+from fish_school import FishSchool
+from lod import PopulationLOD
+from world_process import WORLD_PROCESS, get_world_process
+from text_cache import render_text
+from rendering import DirtyRectRenderer, StaticLayer, invalidate_layers
+from input_source import LiveInput
+from frame_stats import frame_stats, stats_overlay
+
+# Simulation runs at a fixed tick rate, independent of how fast frames are rendered
+TICK_RATE = 60
+TICK_TIME = 1.0 / TICK_RATE
+MAX_FRAME_TIME = 0.25  # Longest frame we catch up on (avoids a spiral of catch-up ticks after a stall)
+
+# Render frame cap, 0 renders uncapped (FISHGAME_FPS overrides)
+RENDER_FPS = int(os.environ.get("FISHGAME_FPS", FPS))
+
+# Opt-in dirty-rect rendering for the game loop (FISHGAME_DIRTY_RECTS=1)
+DIRTY_RECTS = os.environ.get("FISHGAME_DIRTY_RECTS") == "1"
+
+# World size in pixels, bigger than the window (the camera scrolls over it)
+WORLD_WIDTH = 8192
+WORLD_HEIGHT = 4608
+
+# Fish across the whole world (FISHGAME_FISH overrides), only the ones around the camera are simulated one by one
+FISH_COUNT = int(os.environ.get("FISHGAME_FISH", 10000))
+
+# Instructions shown in the top-left corner of the game screen
+INSTRUCTIONS = [
+    "Use WASD or Arrow Keys to move",
+    "ESC: Pause menu",
+    "F11: Toggle fullscreen"
+]
+
+def draw_instructions(surface):
+    """Draw the instruction lines, returns the rect they cover"""
+    rects = []
+    for i, instruction in enumerate(INSTRUCTIONS):
+        text_surface = render_text(text_font, instruction, True, WHITE)
+        rects.append(surface.blit(text_surface, (20, 20 + i * 30)))
+    return rects[0].unionall(rects[1:])
+
+def draw_game_frame(surface, chunk_map, camera, player, school, interpolation=1.0):
+    """Draw one full game frame (world chunks, fish, player, instructions), returns the player rects"""
+    with frame_stats.section('chunks.draw'):
+        chunk_map.draw(surface, camera)
+    with frame_stats.section('fish.draw'):
+        school.draw(surface, interpolation, camera)
+    with frame_stats.section('player.draw'):
+        drawn_rects = player.draw(surface, text_font, BLUE, BLACK, WHITE, interpolation, camera)
+    
+    # Instructions stay fixed on screen, on top of everything
+    draw_instructions(surface)
+    return drawn_rects
+
+def update_state_digest(digest, world, camera, fish_rng, fish_lod, simulated_time):
+    """Feed the game state (entities, RNGs, camera, fish population) into a hashlib digest"""
+    for name, _ in world.COLUMNS:
+        digest.update(getattr(world, name)[:world.count].tobytes())
+    digest.update(repr(fish_rng.bit_generator.state).encode('utf-8'))
+    digest.update(repr(session_rng.getstate()).encode('utf-8'))
+    digest.update(repr((camera.x, camera.y, camera.view_width, camera.view_height, simulated_time)).encode('utf-8'))
+    if fish_lod:
+        digest.update(fish_lod.density.tobytes())
+        digest.update(repr((fish_lod.tick, fish_lod.spawned, fish_lod.folded)).encode('utf-8'))
 
 class PauseMenu:
     def __init__(self):
+        # Game frame captured when pausing, with the dim overlay and title already blended in
+        self.frozen_frame = None
         self.create_buttons()
         
     def create_buttons(self):
@@ -49,6 +120,9 @@ class PauseMenu:
         # Action results
         self.result = None
         
+        # Buttons have to be drawn in full over the frozen frame
+        self.needs_full_redraw = True
+        
     def resume_action(self):
         self.result = "resume"
         
@@ -63,10 +137,34 @@ class PauseMenu:
         # This more thoroughly updates button positions for new screen sizes
         self.create_buttons()
         
-    def handle_events(self, events):
-        """Handle pause menu events"""
-        mouse_pos = pygame.mouse.get_pos()
+        # The captured frame no longer matches the screen
+        self.unfreeze()
+        
+    def freeze(self, surface):
+        """Capture the current game frame once and pre-blend the dim overlay and title into it"""
+        frozen = surface.copy()
+        width, height = frozen.get_size()
+        
+        # Semi-transparent overlay, blended a single time
+        overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 180))  # Dark semi-transparent background
+        frozen.blit(overlay, (0, 0))
+        
+        # Draw title
+        title_text = render_text(button_font, "PAUSED", True, WHITE)
+        title_rect = title_text.get_rect(center=(width // 2, height * 0.3))
+        frozen.blit(title_text, title_rect)
+        
+        self.frozen_frame = frozen
+        self.needs_full_redraw = True
+        
+    def unfreeze(self):
+        """Drop the captured frame (on resume or resize)"""
+        self.frozen_frame = None
+        self.needs_full_redraw = True
         
+    def handle_events(self, events, mouse_pos):
+        """Handle pause menu events"""        
         # Check button hover states
         self.resume_button.check_hover(mouse_pos)
         self.start_over_button.check_hover(mouse_pos)
@@ -84,36 +182,76 @@ class PauseMenu:
         return self.result
         
     def draw(self, surface):
-        """Draw the pause menu"""
-        # Semi-transparent overlay
-        overlay = pygame.Surface((current_width, current_height), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))  # Dark semi-transparent background
-        surface.blit(overlay, (0, 0))
+        """Draw the pause menu over the frozen frame, returns the rects that changed"""
+        if self.frozen_frame is None:
+            self.freeze(surface)
         
-        # Draw title
-        title_text = button_font.render("PAUSED", True, WHITE)
-        title_rect = title_text.get_rect(center=(current_width // 2, current_height * 0.3))
-        surface.blit(title_text, title_rect)
-        
-        # Draw buttons
-        self.resume_button.draw(surface)
-        self.start_over_button.draw(surface)
-        self.quit_button.draw(surface)
+        buttons = (self.resume_button, self.start_over_button, self.quit_button)
+        
+        # First paused frame: frozen frame plus every button
+        if self.needs_full_redraw:
+            surface.blit(self.frozen_frame, (0, 0))
+            for button in buttons:
+                button.draw(surface)
+            self.needs_full_redraw = False
+            return [surface.get_rect()]
+        
+        # After that only buttons whose hover state changed are redrawn
+        changed_rects = []
+        for button in buttons:
+            if button.is_hovered != button.was_hovered:
+                surface.blit(self.frozen_frame, button.rect, button.rect)
+                button.draw(surface)
+                changed_rects.append(button.rect)
+        return changed_rects
 
-def run_game(player_name):
-    """Main game function that runs when Start Game is pressed"""
+def run_game(player_name, dirty_rects=DIRTY_RECTS, render_fps=RENDER_FPS, input_source=None,
+             max_frames=None, max_seconds=None, frame_dt=None, world_process=WORLD_PROCESS,
+             window=None, digest=None):
+    """Main game function that runs when Start Game is pressed
+    
+    Returns True to go back to the start screen, False when the player quits the game.
+    For headless runs, input_source replaces the real devices, max_frames / max_seconds
+    (simulated) stop the loop, and frame_dt uses a fixed frame time instead of the wall clock.
+    world_process moves the fish population (LOD tiers, spawning and folding regions, steering)
+    to the worker forked at startup, this loop only draws the live fish it publishes. The worker
+    runs on wall-clock time, so it isn't reproduced by input replays, and it only exists where
+    it could be forked before the display started (otherwise the fish are simulated here).
+    window is the start screen's window state as returned by start_screen.window_state() (read
+    when the game starts if not given), the game opens at and leaves fullscreen to that size.
+    digest, a hashlib object, is updated with the final game state when the loop exits (replays
+    compare it with the recording's).
+    """
     # Make variables global 
-    global screen, current_width, current_height, maximized
+    global screen, current_width, current_height
+    
+    # Window the game opens at and returns to from fullscreen
+    _, _, max_width, max_height, maximized = window if window is not None else window_state()
+    
+    # Every entity in the game world lives in one array-backed store, the player is a view into it
+    world = EntityStore()
     
-    # Create the player
-    player = Player(player_name, current_width, current_height)
+    # Create the player in the middle of the world
+    player = Player(player_name, WORLD_WIDTH, WORLD_HEIGHT, world)
     
-    # Store original player position relative to screen
-    player_rel_x = 0.5  # Center horizontally (50%)
-    player_rel_y = 0.5  # Center vertically (50%)
+    # School of fish spread over the world that flocks and flees the player (seeded from the session RNG for replays)
+    fish_seed = session_rng.getrandbits(64)
+    fish_rng = np.random.default_rng(fish_seed)
     
-    # Create a dark blue background (deeper than the menu)
-    background_color = (10, 30, 70)
+    # Fish near the camera are individuals (full or reduced rate), the rest are counts per region
+    school = FishSchool(world, 0, WORLD_WIDTH, WORLD_HEIGHT, fish_rng)
+    
+    # Optional worker process that runs the population, this loop then only draws the live fish it publishes
+    # (None where it couldn't be started, the population is then simulated here)
+    world_sim = get_world_process() if world_process else None
+    fish_lod = None
+    if world_sim:
+        world_sim.reset(FISH_COUNT, WORLD_WIDTH, WORLD_HEIGHT, fish_seed)
+    else:
+        fish_lod = PopulationLOD(school, WORLD_WIDTH, WORLD_HEIGHT, FISH_COUNT)
+    
+    # World background, generated chunk by chunk as the camera reaches it
+    chunk_map = ChunkMap(WORLD_WIDTH, WORLD_HEIGHT, seed=fish_seed)
     
     # FULLSCREEN IMPLEMENTATION
     fullscreen = False  # Track true fullscreen state
@@ -124,8 +262,8 @@ def run_game(player_name):
     
     # Set initial window size based on maximized state
     if maximized:
-        current_width = MAX_WIDTH
-        current_height = MAX_HEIGHT
+        current_width = max_width
+        current_height = max_height
     else:
         current_width = DEFAULT_WIDTH
         current_height = DEFAULT_HEIGHT
@@ -134,35 +272,84 @@ def run_game(player_name):
     screen = pygame.display.set_mode((current_width, current_height), pygame.RESIZABLE)
     pygame.display.set_caption("fishgame.")
     
+    # The window can come back at another size than asked for (e.g. right after leaving fullscreen)
+    current_width, current_height = screen.get_size()
+    
+    # Camera follows the player over the world
+    camera = Camera(current_width, current_height, WORLD_WIDTH, WORLD_HEIGHT)
+    camera.follow(player.x, player.y)
+    
+    # Spawn the fish around the starting view before the first frame
+    if fish_lod:
+        fish_lod.refresh(camera)
+    
+    # World chunks under the camera for dirty-rect restores, rebuilt on resize or F11 (camera moves scroll it in place)
+    background_layer = StaticLayer(lambda surface: chunk_map.draw(surface, camera))
+    background_camera = None  # Camera position the dirty renderer's background shows
+    
     # Pause menu
     pause_menu = PauseMenu()
     paused = False
     
+    # Dirty-rect renderer only redraws and presents the regions the player moved through
+    dirty_renderer = DirtyRectRenderer() if dirty_rects else None
+    
+    # Input comes from the real devices unless a scripted source is given
+    if input_source is None:
+        input_source = LiveInput()
+    
     # Add a key tracking variable to detect NEW keypresses
-    last_keys = pygame.key.get_pressed()
+    last_keys = input_source.keys
+    
+    # Fixed-timestep accumulator (unsimulated time carried over between frames)
+    accumulator = 0.0
+    last_frame_time = time.perf_counter()
+    
+    # Frames rendered and time simulated so far (for headless run limits)
+    frame_count = 0
+    simulated_time = 0.0
+    
+    def finish(back_to_menu):
+        """Leave the game, handing its final state to the digest first"""
+        if digest is not None:
+            update_state_digest(digest, world, camera, fish_rng, fish_lod, simulated_time)
+        return back_to_menu
 
     # Main game loop
     running = True
     while running:
-        # Get current keyboard state
-        current_keys = pygame.key.get_pressed()
+        # Stop once a headless run has reached its frame or simulated time limit
+        if max_frames is not None and frame_count >= max_frames:
+            return finish(True)
+        if max_seconds is not None and simulated_time >= max_seconds:
+            return finish(True)
+        frame_count += 1
+        
+        # Per-phase frame timing (F3 overlay, F4 export)
+        frame_stats.begin_frame('game')
         
-        # Get events
-        events = pygame.event.get()
+        # Get events, keyboard state and mouse position for this frame
+        events = input_source.poll()
+        current_keys = input_source.keys
+        
+        # Real time since the last frame, clamped after stalls (replayed input brings its recorded frame time)
+        now = time.perf_counter()
+        if frame_dt is not None:
+            frame_time = frame_dt
+        elif input_source.frame_time is not None:
+            frame_time = min(input_source.frame_time, MAX_FRAME_TIME)
+        else:
+            frame_time = min(now - last_frame_time, MAX_FRAME_TIME)
+        last_frame_time = now
         
         # Process quit event
         for event in events:
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                return finish(False)
             elif event.type == pygame.VIDEORESIZE and not fullscreen:
-                # Calculate player's relative position before resizing
-                player_rel_x = player.x / current_width
-                player_rel_y = player.y / current_height
-                
                 # Only handle manual resizing in windowed mode
-                current_width, current_height = event.size
-                screen = pygame.display.set_mode((current_width, current_height), pygame.RESIZABLE)
+                screen = pygame.display.set_mode(event.size, pygame.RESIZABLE)
+                current_width, current_height = screen.get_size()
                 
                 # Update prev_width and prev_height for proper fullscreen exit
                 prev_width = current_width
@@ -172,9 +359,11 @@ def run_game(player_name):
                 scale_fonts(current_width, current_height)
                 pause_menu.update_buttons()
                 
-                # Reposition player using relative coordinates
-                player.x = int(player_rel_x * current_width)
-                player.y = int(player_rel_y * current_height)
+                # Static layers have to be rebuilt at the new size
+                invalidate_layers()
+                
+                # The player keeps its place in the world, the camera just shows more or less of it
+                camera.resize(current_width, current_height)
         
         # Handle ESC key - check for NEW press (was up, now down)
         if current_keys[pygame.K_ESCAPE] and not last_keys[pygame.K_ESCAPE]:
@@ -193,85 +382,162 @@ def run_game(player_name):
                 prev_width = current_width
                 prev_height = current_height
                 
-                # Calculate player's relative position before changing screen size
-                player_rel_x = player.x / current_width
-                player_rel_y = player.y / current_height
-                
                 # Switch to true fullscreen
                 screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
-                
-                # Get the new dimensions
-                current_width, current_height = screen.get_size()
             else:
-                # Calculate player's relative position before changing screen size
-                player_rel_x = player.x / current_width
-                player_rel_y = player.y / current_height
-                
                 # Switch back to windowed mode
                 if maximized:
-                    current_width = MAX_WIDTH
-                    current_height = MAX_HEIGHT
+                    current_width = max_width
+                    current_height = max_height
                 else:
                     current_width = DEFAULT_WIDTH
                     current_height = DEFAULT_HEIGHT
                 
                 screen = pygame.display.set_mode((current_width, current_height), pygame.RESIZABLE)
             
+            # Get the new dimensions (the window manager may not give the size we asked for)
+            current_width, current_height = screen.get_size()
+            
             # Scale fonts for new screen size
             scale_fonts(current_width, current_height)
             
             # Update pause menu buttons
             pause_menu.update_buttons()
             
-            # Reposition player using relative coordinates
-            player.x = int(player_rel_x * current_width)
-            player.y = int(player_rel_y * current_height)
+            # Static layers have to be rebuilt at the new size
+            invalidate_layers()
             
-        # FIRST: Clear the screen
-        screen.fill(background_color)
-        
-        # SECOND: Get input and update player when not paused
-        if not paused:
-            player.update(current_keys, current_width, current_height)  # Use current_keys instead of getting them again
-
-        # THIRD: Draw the player
-        player.draw(screen, text_font, BLUE, BLACK, WHITE)
+            # The player keeps its place in the world, the camera just shows more or less of it
+            camera.resize(current_width, current_height)
         
-        # FOURTH: Draw instructions
-        instructions = [
-            "Use WASD or Arrow Keys to move",
-            "ESC: Pause menu",
-            "F11: Toggle fullscreen"
-        ]
+        # F3 shows or hides the frame-time overlay, F4 exports the recorded frame times
+        if current_keys[pygame.K_F3] and not last_keys[pygame.K_F3]:
+            stats_overlay.toggle()
+        if current_keys[pygame.K_F4] and not last_keys[pygame.K_F4]:
+            frame_stats.export()
         
-        for i, instruction in enumerate(instructions):
-            text_surface = text_font.render(instruction, True, WHITE)
-            screen.blit(text_surface, (20, 20 + i * 30))
+        frame_stats.mark('events')
         
-        # FIFTH: Draw pause menu on top if paused
+        # Paused: the game is frozen, so only the pause menu buttons ever need redrawing
         if paused:
-            result = pause_menu.handle_events(events)
-            pause_menu.draw(screen)
+            # Draw the game frame once so it can be captured under the dim overlay
+            if pause_menu.frozen_frame is None:
+                draw_game_frame(screen, chunk_map, camera, player, school)
+                pause_menu.freeze(screen)
+            
+            result = pause_menu.handle_events(events, input_source.mouse_pos)
+            changed_rects = pause_menu.draw(screen)
+            frame_stats.mark('draw')
+            if changed_rects:
+                pygame.display.update(changed_rects)
+            frame_stats.mark('flip')
             
             # Handle pause menu results
             if result == "resume":
                 paused = False
                 pause_menu.result = None
+                pause_menu.unfreeze()
+                
+                # Pause overlay covered the whole screen, start over with a full redraw
+                if dirty_renderer:
+                    dirty_renderer.invalidate()
             elif result == "start_over":
                 # Return to start screen
-                return True
+                return finish(True)
             elif result == "quit":
-                pygame.quit()
-                sys.exit()
+                return finish(False)
+            
+            last_keys = current_keys
+            clock.tick(render_fps)
+            frame_stats.mark('tick')
+            frame_stats.end_frame()
+            continue
+        
+        # Run as many fixed simulation ticks as the elapsed time covers
+        accumulator += frame_time
+        while accumulator >= TICK_TIME:
+            # Fish steering and the batched move over the world first, then the player's own input-driven movement
+            # Only fish around the view are simulated, so the world size and population don't add per-tick cost
+            if fish_lod:
+                with frame_stats.section('fish.update'):
+                    fish_lod.update(camera, player.x, player.y)
+            player.update(current_keys, WORLD_WIDTH, WORLD_HEIGHT)
+            accumulator -= TICK_TIME
+            simulated_time += TICK_TIME
+        
+        # Latest fish snapshot from the worker process
+        if world_sim:
+            with frame_stats.section('fish.sync'):
+                world_sim.sync(school, player.x, player.y, camera)
+        frame_stats.mark('update')
+        
+        # How far we are between the last two ticks, for smooth drawing
+        interpolation = accumulator / TICK_TIME
+        
+        # Center the camera on where the player is drawn this frame
+        camera.follow(*player.interpolated_position(interpolation))
+        
+        # Dirty-rect path: restore and present only what the player covered
+        if dirty_renderer:
+            with frame_stats.section('background.layer'):
+                background = background_layer.get(screen.get_size())
+            
+            # A rebuilt background (resize, F11, fonts) means a full redraw and flip
+            if dirty_renderer.background is not background:
+                dirty_renderer.set_background(background)
+                background_camera = (camera.x, camera.y)
+            
+            # Camera moved: scroll the background, only the strips scrolled into view are drawn
+            dx = background_camera[0] - camera.x
+            dy = background_camera[1] - camera.y
+            if dx or dy:
+                with frame_stats.section('background.scroll'):
+                    dirty_renderer.scroll(dx, dy, lambda surface: chunk_map.draw(surface, camera))
+                background_camera = (camera.x, camera.y)
+            
+            dirty_renderer.begin_frame(screen)
+            with frame_stats.section('fish.draw'):
+                drawn_rects = school.draw(screen, interpolation, camera)
+            with frame_stats.section('player.draw'):
+                drawn_rects += player.draw(screen, text_font, BLUE, BLACK, WHITE, interpolation, camera)
+            
+            # Instructions aren't in the background: their area is restored like the player's and the text
+            # drawn once on top every frame (blending it over text already there would thicken its edges)
+            drawn_rects.append(draw_instructions(screen))
+            
+            # Frame-time overlay (F3) is restored from the background like the player
+            overlay_rect = stats_overlay.draw(screen, frame_stats)
+            if overlay_rect:
+                drawn_rects.append(overlay_rect)
+            frame_stats.mark('draw')
+            
+            dirty_renderer.end_frame(drawn_rects)
+            frame_stats.mark('flip')
+            
+            last_keys = current_keys
+            clock.tick(render_fps)
+            frame_stats.mark('tick')
+            frame_stats.end_frame()
+            continue
+        
+        # Draw the full frame (world chunks, fish, player, instructions)
+        draw_game_frame(screen, chunk_map, camera, player, school, interpolation)
+        
+        # Frame-time overlay (F3) on top of everything
+        stats_overlay.draw(screen, frame_stats)
+        frame_stats.mark('draw')
         
         # FINALLY: Update display
         pygame.display.flip()
+        frame_stats.mark('flip')
         
         # Store current keys for next frame
         last_keys = current_keys
         
-        # Cap framerate
-        clock.tick(FPS)
+        # Cap render framerate (the simulation rate doesn't depend on it)
+        clock.tick(render_fps)
+        frame_stats.mark('tick')
+        frame_stats.end_frame()
     
     # Return to main menu
-    return True
\ No newline at end of file
+    return finish(True)
\ No newline at end of file
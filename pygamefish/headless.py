@@ -0,0 +1,135 @@
+"""Headless runs of the start screen and game loops (soak and perf tests on display-less hosts)
+
+Usage:
+    python headless.py menu --frames 600
+    python headless.py game --seconds 30
+    python headless.py replay session.fishlog --verify
+"""
+import argparse
+import os
+import sys
+import time
+
+# SDL's dummy drivers have to be selected before pygame initializes (importing start_screen does that)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# Games started from the menu (replays) run without a frame cap too
+os.environ.setdefault("FISHGAME_FPS", "0")
+
+import pygame
+
+import start_screen
+import game
+from input_source import ScriptedInput, ReplayInput
+
+# Frame time used for headless runs (one frame per simulation tick)
+HEADLESS_FRAME_TIME = game.TICK_TIME
+
+def run_menu(frames=None, seconds=None, input_source=None, frame_dt=HEADLESS_FRAME_TIME):
+    """Run the start screen loop without a frame cap, returns (frames run, wall seconds)"""
+    if frames is None and seconds is None:
+        raise ValueError("Headless runs need a frame or simulated-seconds limit")
+
+    menu = start_screen.StartScreen(input_source if input_source is not None else ScriptedInput())
+    frame_count = 0
+    start_time = time.perf_counter()
+
+    while frames is None or frame_count < frames:
+        if seconds is not None and frame_count * frame_dt >= seconds:
+            break
+        running = start_screen.menu_frame(menu)
+        frame_count += 1
+        if not running:
+            break
+
+    return frame_count, time.perf_counter() - start_time
+
+def run_game(player_name="Headless Fish", frames=None, seconds=None, input_source=None,
+             frame_dt=HEADLESS_FRAME_TIME, dirty_rects=False):
+    """Run the game loop without a frame cap, returns (back to menu, wall seconds)"""
+    if frames is None and seconds is None:
+        raise ValueError("Headless runs need a frame or simulated-seconds limit")
+
+    start_time = time.perf_counter()
+    back_to_menu = game.run_game(
+        player_name,
+        dirty_rects=dirty_rects,
+        render_fps=0,
+        input_source=input_source if input_source is not None else ScriptedInput(),
+        max_frames=frames,
+        max_seconds=seconds,
+        frame_dt=frame_dt
+    )
+    return back_to_menu, time.perf_counter() - start_time
+
+def replay(path):
+    """Replay a recorded input log as fast as possible
+
+    Returns (frames, wall seconds, state digest, recorded digest), the recorded digest is the
+    state the recording ended in (None for a log without one).
+    """
+    source = ReplayInput(path)
+    start_screen.seed_rng(source.seed)
+    start_screen.restore_window_state(*source.window)
+
+    start_time = time.perf_counter()
+    menu = start_screen.StartScreen(source)
+    running = True
+    while running:
+        running = start_screen.menu_frame(menu)
+    wall_time = time.perf_counter() - start_time
+
+    # Frames the replay didn't get to mean it quit earlier than the recording did
+    left = source.finish()
+    if left:
+        print(f"replay quit with {left} recorded frames left")
+    return source.frame, wall_time, menu.state_digest(), source.expected_digest
+
+def main():
+    parser = argparse.ArgumentParser(description="Run fishgame loops headlessly")
+    parser.add_argument("scene", choices=["menu", "game", "replay"])
+    parser.add_argument("log", nargs="?", help="input log to replay (replay only)")
+    parser.add_argument("--frames", type=int, help="stop after this many frames")
+    parser.add_argument("--seconds", type=float, help="stop after this many simulated seconds")
+    parser.add_argument("--verify", action="store_true", help="also replay a second time and check both runs end in the same state")
+    args = parser.parse_args()
+
+    if args.scene == "replay":
+        if not args.log:
+            parser.error("replay needs an input log")
+        frame_count, wall_time, digest, recorded_digest = replay(args.log)
+        print(f"replay: {frame_count} frames in {wall_time:.2f} s, state {digest}")
+        if recorded_digest is None:
+            print("log has no final state to check against (recording didn't finish)")
+        elif digest != recorded_digest:
+            print(f"replay diverged, the recording ended in state {recorded_digest}")
+            pygame.quit()
+            return 1
+        else:
+            print("replay ended in the recorded state")
+        if args.verify:
+            _, _, second_digest, _ = replay(args.log)
+            if second_digest != digest:
+                print(f"replay is not deterministic, second run ended in state {second_digest}")
+                pygame.quit()
+                return 1
+            print("replay verified, both runs ended in the same state")
+        pygame.quit()
+        return 0
+
+    if args.frames is None and args.seconds is None:
+        parser.error("give --frames and/or --seconds")
+
+    if args.scene == "menu":
+        frame_count, wall_time = run_menu(args.frames, args.seconds)
+        print(f"menu: {frame_count} frames in {wall_time:.2f} s")
+    else:
+        _, wall_time = run_game(frames=args.frames, seconds=args.seconds)
+        print(f"game: finished in {wall_time:.2f} s")
+
+    pygame.quit()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
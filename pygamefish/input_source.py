@@ -0,0 +1,299 @@
+import gzip
+import os
+import struct
+import sys
+import time
+
+import pygame
+
+# Keys whose held state the loops read every frame (recorded as a bitmask, the rest come through events)
+RECORDED_KEYS = (
+    pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN,
+    pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_s,
+    pygame.K_ESCAPE, pygame.K_F11, pygame.K_F3, pygame.K_F4
+)
+
+# Input log: gzip stream with a header, one tagged record per polled frame, then an end trailer
+LOG_MAGIC = b'FLOG'
+LOG_VERSION = 2
+LOG_HEADER = struct.Struct('<4sHQHHHHB')  # magic, version, seed, width, height, max width, max height, maximized
+FRAME_RECORD = struct.Struct('<dhhIH')     # frame time, mouse x, mouse y, held key bits, event count
+EVENT_RECORD = struct.Struct('<IB')        # event type, attribute count
+FRAME_TAG = b'F'
+END_TAG = b'E'                             # Followed by the frame count (<I) and the final state digest (<B + ascii)
+
+DEFAULT_LOG_PATH = 'session.fishlog'
+
+class KeyState:
+    """Key state that can be indexed like pygame.key.get_pressed() (held keys given as a set)"""
+    def __init__(self, held=()):
+        self.held = frozenset(held)
+
+    def __getitem__(self, key):
+        return key in self.held
+
+class LiveInput:
+    """Reads events, keys and mouse position from pygame once per frame"""
+    def __init__(self):
+        self.frame = 0
+        self.events = []
+        self.keys = pygame.key.get_pressed()
+        self.mouse_pos = pygame.mouse.get_pos()
+
+        # Frame time to simulate, None lets the loop use its own clock
+        self.frame_time = None
+
+    def poll(self):
+        """Read this frame's input, returns the frame's events"""
+        self.events = pygame.event.get()
+        self.keys = pygame.key.get_pressed()
+        self.mouse_pos = pygame.mouse.get_pos()
+        self.frame += 1
+        return self.events
+
+class ScriptedInput:
+    """Input played from a script instead of the real devices (for headless runs)
+
+    The script maps frame numbers to a dict with any of:
+      'keys'   - keys held from this frame on (iterable of key constants)
+      'mouse'  - mouse position from this frame on
+      'events' - pygame events delivered on this frame only
+    """
+    def __init__(self, script=None, mouse_pos=(0, 0)):
+        self.script = script or {}
+        self.frame = 0
+        self.events = []
+        self.keys = KeyState()
+        self.mouse_pos = mouse_pos
+        self.frame_time = None
+
+    def poll(self):
+        """Advance to the next scripted frame, returns the frame's events"""
+        # Drain the real queue so SDL doesn't fill up, but ignore what's in it
+        pygame.event.pump()
+        pygame.event.clear()
+
+        step = self.script.get(self.frame, {})
+        if 'keys' in step:
+            self.keys = KeyState(step['keys'])
+        if 'mouse' in step:
+            self.mouse_pos = tuple(step['mouse'])
+        self.events = list(step.get('events', []))
+        self.frame += 1
+        return self.events
+
+def input_log_path():
+    """Return where to record the session's input, or None if recording is off
+
+    Enabled with --record-input[=PATH] or FISHGAME_RECORD_INPUT=PATH (1 = default path)
+    """
+    for arg in sys.argv[1:]:
+        if arg == '--record-input':
+            return DEFAULT_LOG_PATH
+        if arg.startswith('--record-input='):
+            return arg.split('=', 1)[1] or DEFAULT_LOG_PATH
+
+    env_path = os.environ.get('FISHGAME_RECORD_INPUT')
+    if env_path:
+        return DEFAULT_LOG_PATH if env_path == '1' else env_path
+    return None
+
+def _write_value(f, value):
+    """Write one event attribute value with a type tag, returns False for types the log can't hold"""
+    if isinstance(value, bool):
+        f.write(b'b' + struct.pack('<?', value))
+    elif isinstance(value, int):
+        f.write(b'i' + struct.pack('<q', value))
+    elif isinstance(value, float):
+        f.write(b'f' + struct.pack('<d', value))
+    elif isinstance(value, str):
+        data = value.encode('utf-8')
+        f.write(b's' + struct.pack('<H', len(data)) + data)
+    elif isinstance(value, tuple) and all(isinstance(item, int) for item in value):
+        f.write(b't' + struct.pack(f'<B{len(value)}q', len(value), *value))
+    elif value is None:
+        f.write(b'n')
+    else:
+        return False
+    return True
+
+def _read_exact(f, size):
+    """Read exactly size bytes, raises EOFError at the end of the log"""
+    data = f.read(size)
+    if len(data) != size:
+        raise EOFError
+    return data
+
+def _read_value(f):
+    """Read one tagged event attribute value"""
+    tag = _read_exact(f, 1)
+    if tag == b'b':
+        return struct.unpack('<?', _read_exact(f, 1))[0]
+    if tag == b'i':
+        return struct.unpack('<q', _read_exact(f, 8))[0]
+    if tag == b'f':
+        return struct.unpack('<d', _read_exact(f, 8))[0]
+    if tag == b's':
+        length, = struct.unpack('<H', _read_exact(f, 2))
+        return _read_exact(f, length).decode('utf-8')
+    if tag == b't':
+        length, = struct.unpack('<B', _read_exact(f, 1))
+        return struct.unpack(f'<{length}q', _read_exact(f, 8 * length))
+    if tag == b'n':
+        return None
+    raise ValueError(f"Corrupt input log (unknown value tag {tag!r})")
+
+class RecordingInput:
+    """Wraps another input source and writes every polled frame to an input log
+
+    The log holds the RNG seed and window state the session started with, then per frame the
+    frame time, mouse position, held keys (RECORDED_KEYS) and every event, so ReplayInput can
+    play the session back exactly.
+    """
+    def __init__(self, source, path, seed, window):
+        self.source = source
+        self.path = path
+        self.frame = source.frame
+        self.events = source.events
+        self.keys = source.keys
+        self.mouse_pos = source.mouse_pos
+        self.frame_time = None
+        self.last_poll = None
+
+        # window = (width, height, max width, max height, maximized)
+        width, height, max_width, max_height, maximized = window
+        self.file = gzip.open(path, 'wb')
+        self.file.write(LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION, seed, width, height, max_width, max_height, maximized))
+
+    def poll(self):
+        """Poll the wrapped source and record the frame, returns the frame's events"""
+        events = self.source.poll()
+
+        # Frame time measured here is both recorded and used, so the replay simulates the same steps
+        now = time.perf_counter()
+        self.frame_time = 0.0 if self.last_poll is None else now - self.last_poll
+        self.last_poll = now
+
+        self.frame = self.source.frame
+        self.events = events
+        self.keys = self.source.keys
+        self.mouse_pos = self.source.mouse_pos
+
+        key_bits = 0
+        for bit, key in enumerate(RECORDED_KEYS):
+            if self.keys[key]:
+                key_bits |= 1 << bit
+
+        f = self.file
+        f.write(FRAME_TAG)
+        f.write(FRAME_RECORD.pack(self.frame_time, self.mouse_pos[0], self.mouse_pos[1], key_bits, len(events)))
+        for event in events:
+            attributes = list(event.dict.items())
+            f.write(EVENT_RECORD.pack(event.type, len(attributes)))
+            for name, value in attributes:
+                data = name.encode('ascii')
+                f.write(struct.pack('<B', len(data)) + data)
+                if not _write_value(f, value):
+                    # Keep the record readable, values we can't store replay as None
+                    _write_value(f, None)
+        return events
+
+    def close(self, digest=''):
+        """Finish the log with the trailer, digest is the state the session ended in (checked by replays)"""
+        data = digest.encode('ascii')
+        self.file.write(END_TAG + struct.pack('<IB', self.frame, len(data)) + data)
+        self.file.close()
+        print(f"Input log written to {self.path} ({self.frame} frames)")
+
+class ReplayInput:
+    """Plays back an input log written by RecordingInput, then sends QUIT once it runs out
+
+    seed and window hold the state the recorded session started with, restore them before
+    creating the start screen. finish() reads the trailer with the state the session ended in.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.file = gzip.open(path, 'rb')
+        magic, version, seed, width, height, max_width, max_height, maximized = LOG_HEADER.unpack(
+            _read_exact(self.file, LOG_HEADER.size)
+        )
+        if magic != LOG_MAGIC or version != LOG_VERSION:
+            raise ValueError(f"{path} is not a version {LOG_VERSION} input log")
+
+        self.seed = seed
+        self.window = (width, height, max_width, max_height, bool(maximized))
+        self.finished = False
+
+        # From the trailer (None until it's read, or if the recording never finished)
+        self.recorded_frames = None
+        self.expected_digest = None
+
+        self.frame = 0
+        self.events = []
+        self.keys = KeyState()
+        self.mouse_pos = (0, 0)
+        self.frame_time = None
+
+    def poll(self):
+        """Advance to the next recorded frame, returns the frame's events"""
+        # Drain the real queue so SDL doesn't fill up, but ignore what's in it
+        pygame.event.pump()
+        pygame.event.clear()
+
+        if not self.finished:
+            try:
+                self.read_frame()
+            except EOFError:
+                self.finished = True
+                self.file.close()
+
+        if self.finished:
+            self.keys = KeyState()
+            self.frame_time = 0.0
+            self.events = [pygame.event.Event(pygame.QUIT)]
+
+        self.frame += 1
+        return self.events
+
+    def read_frame(self):
+        """Read the next frame record into keys, mouse_pos, frame_time and events, EOFError after the last one"""
+        f = self.file
+        tag = _read_exact(f, 1)
+        if tag == END_TAG:
+            self.read_trailer()
+            raise EOFError
+        if tag != FRAME_TAG:
+            raise ValueError(f"Corrupt input log (unknown record tag {tag!r})")
+        frame_time, mouse_x, mouse_y, key_bits, event_count = FRAME_RECORD.unpack(_read_exact(f, FRAME_RECORD.size))
+
+        events = []
+        for _ in range(event_count):
+            event_type, attribute_count = EVENT_RECORD.unpack(_read_exact(f, EVENT_RECORD.size))
+            attributes = {}
+            for _ in range(attribute_count):
+                length, = struct.unpack('<B', _read_exact(f, 1))
+                name = _read_exact(f, length).decode('ascii')
+                attributes[name] = _read_value(f)
+            events.append(pygame.event.Event(event_type, attributes))
+
+        self.frame_time = frame_time
+        self.mouse_pos = (mouse_x, mouse_y)
+        self.keys = KeyState(key for bit, key in enumerate(RECORDED_KEYS) if key_bits & (1 << bit))
+        self.events = events
+
+    def read_trailer(self):
+        """Read the frame count and final state digest after the END_TAG"""
+        self.recorded_frames, length = struct.unpack('<IB', _read_exact(self.file, 5))
+        self.expected_digest = _read_exact(self.file, length).decode('ascii') or None
+
+    def finish(self):
+        """Skip any frames left unplayed and read the trailer, returns how many frames were left"""
+        left = 0
+        while not self.finished:
+            try:
+                self.read_frame()
+                left += 1
+            except EOFError:
+                self.finished = True
+                self.file.close()
+        return left
@@ -0,0 +1,134 @@
+import numpy as np
+
+from entities import KIND_FISH
+
+# Side of a far-tier density region in world pixels (same as a world chunk)
+REGION_SIZE = 512
+
+class PopulationLOD:
+    """Level-of-detail tiers for a fish school spread over a world bigger than the view
+
+    near: live fish within NEAR_MARGIN of the view are steered and moved every tick.
+    mid:  the other live fish are steered and moved every MID_INTERVAL ticks (by MID_INTERVAL
+          ticks of velocity at once), a different slice of them each tick to spread the work.
+    far:  past MID_MARGIN, fish only exist as a count per REGION_SIZE region. A region's fish are
+          spawned as individuals when it comes within MID_MARGIN of the view, and live fish that
+          swim a region further out are folded back into the count of the region they're in.
+
+    Live fish never get far from the view and regions stop spawning at REGION_FISH live fish,
+    so per-tick cost depends on the area around the camera, not on the world size or
+    the total population.
+    """
+    NEAR_MARGIN = 128
+    MID_MARGIN = 640
+    MID_INTERVAL = 4
+
+    # Regions don't spawn past this many live fish (the rest stay as their count)
+    REGION_FISH = 256
+
+    def __init__(self, school, world_width, world_height, population, region_size=REGION_SIZE):
+        self.school = school
+        self.store = school.store
+        self.world_width = world_width
+        self.world_height = world_height
+        self.region_size = region_size
+        self.cols = -(-world_width // region_size)
+        self.rows = -(-world_height // region_size)
+
+        # Whole population starts as far fish, spread over the regions by area (edge regions can be partial)
+        widths = np.minimum(region_size, world_width - np.arange(self.cols) * region_size)
+        heights = np.minimum(region_size, world_height - np.arange(self.rows) * region_size)
+        area = np.outer(heights, widths).astype(np.float64).ravel()
+        self.density = school.rng.multinomial(population, area / area.sum()).reshape(self.rows, self.cols)
+
+        # Ticks run so far (picks the mid-tier slice)
+        self.tick = 0
+
+        # Counters
+        self.spawned = 0
+        self.folded = 0
+        self.near_count = 0
+        self.mid_count = 0
+
+    def update(self, camera, player_x, player_y):
+        """Run one simulation tick: move fish between tiers around the camera, then steer and move near and mid fish"""
+        self.refresh(camera)
+
+        store = self.store
+        school = self.school
+        near = store.cull(*camera.rect(self.NEAR_MARGIN), KIND_FISH)
+        mid = np.setdiff1d(school.ids, near, assume_unique=True)
+        mid = mid[mid % self.MID_INTERVAL == self.tick % self.MID_INTERVAL]
+        self.tick += 1
+        self.near_count = len(near)
+        self.mid_count = len(mid)
+
+        # Steered together so fish on either side of the tier boundary still see each other
+        active = np.concatenate([near, mid])
+        school.steer(player_x, player_y, self.world_width, self.world_height, active)
+        store.step(near)
+        store.step(mid, self.MID_INTERVAL)
+        school.confine(self.world_width, self.world_height, active)
+
+    def refresh(self, camera):
+        """Fold live fish that left the area around the camera into region counts, spawn regions that entered it"""
+        school = self.school
+        store = self.store
+        size = self.region_size
+
+        # Fold one region further out than the spawn margin, so freshly spawned fish aren't folded straight back
+        left, top, right, bottom = camera.rect(self.MID_MARGIN + size)
+        x = store.x[school.ids]
+        y = store.y[school.ids]
+        outside = (x < left) | (x >= right) | (y < top) | (y >= bottom)
+        if outside.any():
+            cols = np.clip((x[outside] // size).astype(np.int64), 0, self.cols - 1)
+            rows = np.clip((y[outside] // size).astype(np.int64), 0, self.rows - 1)
+            np.add.at(self.density, (rows, cols), 1)
+            school.remove(school.ids[outside])
+            self.folded += int(np.count_nonzero(outside))
+
+        # Spawn every region overlapping the spawn margin that still holds far fish
+        left, top, right, bottom = camera.rect(self.MID_MARGIN)
+        first_col = max(int(left) // size, 0)
+        last_col = min((int(right) - 1) // size, self.cols - 1)
+        first_row = max(int(top) // size, 0)
+        last_row = min((int(bottom) - 1) // size, self.rows - 1)
+        window = self.density[first_row:last_row + 1, first_col:last_col + 1]
+        if not window.any():
+            return
+
+        # Live fish per region in the window, for the cap
+        rows = (store.y[school.ids] // size).astype(np.int64) - first_row
+        cols = (store.x[school.ids] // size).astype(np.int64) - first_col
+        inside = (rows >= 0) & (rows < window.shape[0]) & (cols >= 0) & (cols < window.shape[1])
+        live = np.bincount(rows[inside] * window.shape[1] + cols[inside], minlength=window.size)
+        room = np.maximum(self.REGION_FISH - live.reshape(window.shape), 0)
+
+        rows, cols = np.nonzero(np.minimum(window, room))
+        if len(rows) == 0:
+            return
+        counts = np.minimum(window[rows, cols], room[rows, cols])
+        region_left = np.repeat((cols + first_col) * size, counts)
+        region_top = np.repeat((rows + first_row) * size, counts)
+        region_width = np.minimum(size, self.world_width - region_left)
+        region_height = np.minimum(size, self.world_height - region_top)
+
+        # Scattered over their region, the fish inside a region weren't tracked
+        total = len(region_left)
+        rng = school.rng
+        school.add(region_left + rng.uniform(0, 1, total) * region_width,
+                   region_top + rng.uniform(0, 1, total) * region_height)
+        window[rows, cols] -= counts
+        self.spawned += total
+
+    def stats(self):
+        """Return fish per tier and the spawn/fold counters"""
+        return {
+            'near': self.near_count,
+            'mid_per_tick': self.mid_count,
+            'live': len(self.school),
+            'far': int(self.density.sum()),
+            'spawned': self.spawned,
+            'folded': self.folded
+        }
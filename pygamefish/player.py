@@ -1,22 +1,40 @@
 import pygame
 
+from text_cache import render_text
+from entities import EntityStore, EntityField, KIND_PLAYER
+
 class Player:
-    def __init__(self, name, current_width, current_height):
+    """The player entity, a thin view over its row in an EntityStore"""
+    # Position, position at the previous simulation tick (for interpolated drawing), size and
+    # movement speed (pixels per simulation tick) live in the store's columns
+    x = EntityField('x')
+    y = EntityField('y')
+    prev_x = EntityField('prev_x')
+    prev_y = EntityField('prev_y')
+    width = EntityField('width')
+    height = EntityField('height')
+    speed = EntityField('speed')
+    
+    def __init__(self, name, world_width, world_height, store=None):
         self.name = name
         
-        # Position (center of screen)
-        self.x = current_width // 2
-        self.y = current_height // 2
+        # Shared world store, or a private one for a standalone player
+        self.store = store if store is not None else EntityStore(capacity=1)
         
-        # Size
-        self.width = 50
-        self.height = 50
+        # Spawn in the center of the world
+        self.entity_id = self.store.spawn(
+            KIND_PLAYER,
+            world_width // 2, world_height // 2,
+            50, 50,
+            speed=5
+        )
         
-        # Movement speed
-        self.speed = 5
+    def update(self, keys_pressed, world_width, world_height):
+        """Advance the player by one simulation tick based on key presses"""
+        # Remember where we were for interpolation
+        self.prev_x = self.x
+        self.prev_y = self.y
         
-    def update(self, keys_pressed, current_width, current_height):
-        """Update player position based on key presses"""
         # Handle movement
         if keys_pressed[pygame.K_LEFT] or keys_pressed[pygame.K_a]:
             self.x -= self.speed
@@ -27,16 +45,31 @@ class Player:
         if keys_pressed[pygame.K_DOWN] or keys_pressed[pygame.K_s]:
             self.y += self.speed
             
-        # Keep player on screen
-        self.x = max(self.width // 2, min(current_width - self.width // 2, self.x))
-        self.y = max(self.height // 2, min(current_height - self.height // 2, self.y))
+        # Keep player inside the world
+        self.x = max(self.width // 2, min(world_width - self.width // 2, self.x))
+        self.y = max(self.height // 2, min(world_height - self.height // 2, self.y))
+        
+    def interpolated_position(self, interpolation=1.0):
+        """Return the world position blended between the previous tick (0.0) and the current tick (1.0)"""
+        x = round(self.prev_x + (self.x - self.prev_x) * interpolation)
+        y = round(self.prev_y + (self.y - self.prev_y) * interpolation)
+        return x, y
+        
+    def draw(self, surface, text_font, BLUE, BLACK, WHITE, interpolation=1.0, camera=None):
+        """Draw the player as a simple colored rectangle, returns the rects that were drawn
+        
+        interpolation blends between the previous tick (0.0) and the current tick (1.0),
+        camera (if given) converts world positions to screen positions
+        """
+        x, y = self.interpolated_position(interpolation)
+        if camera is not None:
+            x -= camera.x
+            y -= camera.y
         
-    def draw(self, surface, text_font, BLUE, BLACK, WHITE):
-        """Draw the player as a simple colored rectangle"""
         # Draw player body
         player_rect = pygame.Rect(
-            self.x - self.width // 2,
-            self.y - self.height // 2,
+            x - self.width // 2,
+            y - self.height // 2,
             self.width,
             self.height
         )
@@ -44,8 +77,10 @@ class Player:
         pygame.draw.rect(surface, BLACK, player_rect, 2)  # Border
         
         # Draw player name above
-        name_surface = text_font.render(self.name, True, WHITE)
-        surface.blit(name_surface, (
-            self.x - name_surface.get_width() // 2,
-            self.y - self.height // 2 - name_surface.get_height() - 5
-        ))
\ No newline at end of file
+        name_surface = render_text(text_font, self.name, True, WHITE)
+        name_rect = surface.blit(name_surface, (
+            x - name_surface.get_width() // 2,
+            y - self.height // 2 - name_surface.get_height() - 5
+        ))
+        
+        return [player_rect, name_rect]
\ No newline at end of file
@@ -0,0 +1,125 @@
+import weakref
+
+import pygame
+
+# Every live static layer, so they can all be invalidated at once
+_layers = weakref.WeakSet()
+
+def invalidate_layers():
+    """Mark every static layer stale (resize, maximize toggle, fullscreen toggle or font change)"""
+    for layer in list(_layers):
+        layer.invalidate()
+
+class DirtyRectRenderer:
+    """Restores only the regions moving elements covered, then presents them with display.update(rects)"""
+    def __init__(self):
+        self.background = None
+        self.previous_rects = []
+        self.full_redraw = True
+
+    def invalidate(self):
+        """Force a full redraw and flip on the next frame (resize, fullscreen toggle, etc.)"""
+        self.full_redraw = True
+        self.previous_rects = []
+
+    def set_background(self, background):
+        """Set the cached background that dirty regions are restored from"""
+        self.background = background
+        self.invalidate()
+
+    def begin_frame(self, surface):
+        """Erase last frame's moving elements (or the whole screen on a full redraw)"""
+        if self.full_redraw:
+            surface.blit(self.background, (0, 0))
+        else:
+            for rect in self.previous_rects:
+                surface.blit(self.background, rect, rect)
+
+    def scroll(self, dx, dy, draw_background):
+        """Move the background by (dx, dy) pixels, redrawing only the strips scrolled into view
+
+        draw_background is called with the background clipped to each strip. Every pixel on
+        screen moves, so the next frame is a full one (a single blit of the background and a flip).
+        """
+        background = self.background
+        width, height = background.get_size()
+        if abs(dx) >= width or abs(dy) >= height:
+            # Nothing left to reuse
+            regions = [background.get_rect()]
+        else:
+            background.scroll(dx, dy)
+            regions = []
+            if dx:
+                regions.append(pygame.Rect(0 if dx > 0 else width + dx, 0, abs(dx), height))
+            if dy:
+                regions.append(pygame.Rect(0, 0 if dy > 0 else height + dy, width, abs(dy)))
+
+        for rect in regions:
+            background.set_clip(rect)
+            draw_background(background)
+        background.set_clip(None)
+        self.invalidate()
+
+    def end_frame(self, drawn_rects):
+        """Present the frame, pushing only old and new bounds of the moving elements"""
+        clip = pygame.Rect((0, 0), self.background.get_size())
+        current_rects = [rect.clip(clip) for rect in drawn_rects]
+
+        if self.full_redraw:
+            pygame.display.flip()
+            self.full_redraw = False
+        else:
+            pygame.display.update(self.previous_rects + current_rects)
+
+        self.previous_rects = current_rects
+
+class StaticLayer:
+    """Opaque static content rendered once into a full-screen display-format surface and blitted as a single operation
+
+    Only for content that covers the screen: a full-screen alpha layer would cost a blend of
+    every pixel each frame, use StaticBlits for sparse content like text instead.
+    """
+    def __init__(self, draw_func):
+        self.draw_func = draw_func  # Called with the layer surface to render its content
+        self.surface = None
+        self.rebuilds = 0
+        _layers.add(self)
+
+    def invalidate(self):
+        """Drop the rendered layer so it is rebuilt on next use"""
+        self.surface = None
+
+    def get(self, size):
+        """Return the layer surface for the given screen size, rebuilding it if stale"""
+        if self.surface is None or self.surface.get_size() != tuple(size):
+            layer = pygame.Surface(size).convert()
+            self.draw_func(layer)
+            self.surface = layer
+            self.rebuilds += 1
+        return self.surface
+
+    def draw(self, surface):
+        """Blit the whole layer onto the surface"""
+        return surface.blit(self.get(surface.get_size()), (0, 0))
+
+class StaticBlits:
+    """Sparse static content (e.g. text) kept as its own small surfaces and positions, drawn in one blits() call"""
+    def __init__(self, build_func):
+        self.build_func = build_func  # Called with the screen size, returns [(surface, (x, y)), ...]
+        self.blit_sequence = None
+        self.size = None
+        self.rebuilds = 0
+        _layers.add(self)
+
+    def invalidate(self):
+        """Drop the cached blits so they are rebuilt on next use"""
+        self.blit_sequence = None
+
+    def draw(self, surface):
+        """Blit every cached surface at its position, returns the rects drawn"""
+        size = surface.get_size()
+        if self.blit_sequence is None or self.size != size:
+            self.blit_sequence = self.build_func(size)
+            self.size = size
+            self.rebuilds += 1
+        return surface.blits(self.blit_sequence)
@@ -0,0 +1,140 @@
+import numpy as np
+
+class SpatialGrid:
+    """Uniform grid index over a set of points, rebuilt in one vectorized pass"""
+    def __init__(self, cell_size):
+        self.cell_size = float(cell_size)
+
+        # Cell layout (set by rebuild)
+        self.origin_x = 0
+        self.origin_y = 0
+        self.cols = 0
+        self.rows = 0
+
+        # Cell of every point, point indices sorted by cell, and where each cell starts in that order
+        self.cell_id = np.empty(0, dtype=np.int64)
+        self.order = np.empty(0, dtype=np.int64)
+        self.starts = np.zeros(1, dtype=np.int64)
+
+    def rebuild(self, x, y):
+        """Bucket every point into its grid cell (counting sort by cell id)"""
+        if len(x) == 0:
+            self.cols = self.rows = 0
+            self.cell_id = np.empty(0, dtype=np.int64)
+            self.order = np.empty(0, dtype=np.int64)
+            self.starts = np.zeros(1, dtype=np.int64)
+            return
+
+        cell_x = np.floor(x / self.cell_size).astype(np.int64)
+        cell_y = np.floor(y / self.cell_size).astype(np.int64)
+
+        # Grid covers the bounding box of the points
+        self.origin_x = int(cell_x.min())
+        self.origin_y = int(cell_y.min())
+        self.cols = int(cell_x.max()) - self.origin_x + 1
+        self.rows = int(cell_y.max()) - self.origin_y + 1
+
+        cell_id = (cell_y - self.origin_y) * self.cols + (cell_x - self.origin_x)
+        self.cell_id = cell_id
+        self.order = np.argsort(cell_id, kind='stable')
+        counts = np.bincount(cell_id, minlength=self.cols * self.rows)
+        self.starts = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.starts[1:])
+
+    def query_rect(self, left, top, right, bottom):
+        """Return indices of points in every cell overlapping the rectangle"""
+        if self.cols == 0:
+            return self.order
+
+        # Clamp the covered cell range to the grid
+        first_col = max(int(np.floor(left / self.cell_size)) - self.origin_x, 0)
+        last_col = min(int(np.floor(right / self.cell_size)) - self.origin_x, self.cols - 1)
+        first_row = max(int(np.floor(top / self.cell_size)) - self.origin_y, 0)
+        last_row = min(int(np.floor(bottom / self.cell_size)) - self.origin_y, self.rows - 1)
+        if first_col > last_col or first_row > last_row:
+            return self.order[:0]
+
+        # Cells in a row are contiguous in the sorted order, so each row is one slice
+        slices = []
+        for row in range(first_row, last_row + 1):
+            row_start = row * self.cols
+            start = self.starts[row_start + first_col]
+            end = self.starts[row_start + last_col + 1]
+            if end > start:
+                slices.append(self.order[start:end])
+
+        if not slices:
+            return self.order[:0]
+        if len(slices) == 1:
+            return slices[0]
+        return np.concatenate(slices)
+
+    def query_radius(self, x, y, radius):
+        """Return indices of points in cells that could lie within radius of (x, y)"""
+        return self.query_rect(x - radius, y - radius, x + radius, y + radius)
+
+    def neighborhood_sums(self, weights=None):
+        """For every point, sum weights (None = count) over the points in its cell and the 8 around it
+
+        The point itself is included. Costs O(points + cells) however crowded the cells are.
+        """
+        if self.cols == 0:
+            return np.zeros(0)
+
+        # Per-cell totals, then a 3x3 box sum over the zero-padded cell grid
+        totals = np.bincount(self.cell_id, weights, self.rows * self.cols).reshape(self.rows, self.cols)
+        padded = np.pad(totals, 1)
+        box = np.zeros_like(totals)
+        for row_offset in range(3):
+            for col_offset in range(3):
+                box += padded[row_offset:row_offset + self.rows, col_offset:col_offset + self.cols]
+        return box.ravel()[self.cell_id]
+
+    def neighbor_pairs(self, x, y, radius):
+        """Return (i, j, dx, dy, dist_sq) for every pair of points closer than radius, each pair once
+
+        The grid must have been rebuilt from the same x, y with cell_size >= radius. dx, dy point
+        from j to i. Each cell is paired with itself and four of its neighbors, which visits every
+        pair of adjacent cells exactly once, all in vectorized passes.
+        """
+        empty = np.empty(0, dtype=np.int64)
+        if self.cols == 0:
+            return empty, empty, np.empty(0), np.empty(0), np.empty(0)
+
+        order = self.order
+        sorted_cells = self.cell_id[order]
+        col = sorted_cells % self.cols
+        row = sorted_cells // self.cols
+
+        i_parts = []
+        j_parts = []
+        for col_offset, row_offset in ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1)):
+            neighbor_col = col + col_offset
+            neighbor_row = row + row_offset
+            valid = (neighbor_col >= 0) & (neighbor_col < self.cols) & (neighbor_row < self.rows)
+            source = np.flatnonzero(valid)  # Positions in the sorted order
+            neighbor_cell = neighbor_row[source] * self.cols + neighbor_col[source]
+
+            # Range of sorted positions to pair each point with (same cell: only the points after it)
+            begin = source + 1 if col_offset == 0 and row_offset == 0 else self.starts[neighbor_cell]
+            end = self.starts[neighbor_cell + 1]
+            counts = np.maximum(end - begin, 0)
+            total = int(counts.sum())
+            if total == 0:
+                continue
+
+            # Expand every (point, range) into one entry per pair
+            run_starts = np.cumsum(counts) - counts
+            i_parts.append(order[np.repeat(source, counts)])
+            j_parts.append(order[np.repeat(begin - run_starts, counts) + np.arange(total)])
+
+        if not i_parts:
+            return empty, empty, np.empty(0), np.empty(0), np.empty(0)
+
+        i = np.concatenate(i_parts)
+        j = np.concatenate(j_parts)
+        dx = x[i] - x[j]
+        dy = y[i] - y[j]
+        dist_sq = dx * dx + dy * dy
+        close = dist_sq < radius * radius
+        return i[close], j[close], dx[close], dy[close], dist_sq[close]
@@ -1,18 +1,31 @@
 import pygame
 import sys
 import random
-import os
-import math
-import shutil
-from PIL import Image, ImageSequence # We'll use Pillow to process the GIF
-from PIL.Image import Resampling
+import hashlib
 
-# Initialize Pygame and mixer
-pygame.init()
-pygame.mixer.init()
+import numpy as np
+
+from asset_manager import assets
+from bubbles import BubbleField, BubbleSpriteCache
+from text_cache import render_text, text_cache
+from fonts import get_font
+from rendering import StaticBlits, invalidate_layers
+from input_source import LiveInput, RecordingInput, input_log_path
+from frame_stats import frame_stats, stats_overlay
+import bootstrap
+import world_process
+
+# The fish worker (FISHGAME_WORLD_PROCESS=1) forks while this process is still single-threaded,
+# before SDL, the mixer and the GIF decoder start
+if world_process.WORLD_PROCESS:
+    bootstrap.run_once("world process", world_process.start_world_process)
+
+# Initialize Pygame and mixer (once per process, even if this module is imported again)
+bootstrap.run_once("pygame.init", pygame.init)
+bootstrap.run_once("mixer.init", pygame.mixer.init)
 
 # Get monitor info
-info = pygame.display.Info()
+info = bootstrap.run_once("display.Info", pygame.display.Info)
 MONITOR_WIDTH = info.current_w
 MONITOR_HEIGHT = info.current_h
 
@@ -47,87 +60,13 @@ music_volume = 0.1  # 50% volume by default
 sfx_volume = 0.7   # 70% volume by default for SFX
 
 # Create the screen (initially maximized but still a regular window)
-screen = pygame.display.set_mode((current_width, current_height), pygame.RESIZABLE)
+screen = bootstrap.run_once("set_mode", pygame.display.set_mode, (current_width, current_height), pygame.RESIZABLE)
 pygame.display.set_caption("fishgame.")
-clock = pygame.time.Clock()
-
-# Create asset directories if they don't exist
-if not os.path.exists('assets'):
-    os.makedirs('assets')
-if not os.path.exists('assets/music'):
-    os.makedirs('assets/music')
-if not os.path.exists('assets/sounds'):
-    os.makedirs('assets/sounds')
-if not os.path.exists('assets/images'):
-    os.makedirs('assets/images')
-if not os.path.exists('assets/fonts'):
-    os.makedirs('assets/fonts')
-if not os.path.exists('assets/animations'):
-    os.makedirs('assets/animations')
-
-# Check if maintheme.mp3 exists in root, if so, move it to assets/music
-if os.path.exists('maintheme.mp3') and not os.path.exists('assets/music/maintheme.mp3'):
-    shutil.move('maintheme.mp3', 'assets/music/maintheme.mp3')
-
-# Check if mainmenu.gif exists in root, if so, move it to assets/animations
-if os.path.exists('mainmenu.gif') and not os.path.exists('assets/animations/mainmenu.gif'):
-    shutil.move('mainmenu.gif', 'assets/animations/mainmenu.gif')
-
-# Music file path
-main_theme_path = 'assets/music/maintheme.mp3'
-
-pop_drip_sound = None
-digi_plink_sound = None
-click_04_sound = None
-start_game_sound = None
-
-# Check if pop_drip.wav exists in root, if so, move it to assets/sounds
-if os.path.exists('pop_drip.wav') and not os.path.exists('assets/sounds/pop_drip.wav'):
-    shutil.move('pop_drip.wav', 'assets/sounds/pop_drip.wav')
-
-# Check if digi_plink.wav exists in root, if so, move it to assets/sounds  
-if os.path.exists('digi_plink.wav') and not os.path.exists('assets/sounds/digi_plink.wav'):
-    shutil.move('digi_plink.wav', 'assets/sounds/digi_plink.wav')
-
-# Check if click_04.wav exists in root, if so, move it to assets/sounds
-if os.path.exists('click_04.wav') and not os.path.exists('assets/sounds/click_04.wav'):
-    shutil.move('click_04.wav', 'assets/sounds/click_04.wav')
-    shutil.move('click_04.wav', 'assets/sounds/click_04.wav')
-
-if os.path.exists('start_game.wav') and not os.path.exists('assets/sounds/start_game.wav'):
-    shutil.move('start_game.wav', 'assets/sounds/start_game.wav')
-
-# Load sound effects
-if os.path.exists('assets/sounds/pop_drip.wav'):
-    pop_drip_sound = pygame.mixer.Sound('assets/sounds/pop_drip.wav')
-    pop_drip_sound.set_volume(0.5 * sfx_volume) 
-else:
-    print("Warning: pop_drip.wav not found. Bubble sounds will not play.")
-
-if os.path.exists('assets/sounds/digi_plink.wav'):
-    digi_plink_sound = pygame.mixer.Sound('assets/sounds/digi_plink.wav')
-    digi_plink_sound.set_volume(0.5 * sfx_volume) 
-else:
-    print("Warning: digi_plink.wav not found. Button sounds will not play.")
-
-if os.path.exists('assets/sounds/click_04.wav'):
-    click_04_sound = pygame.mixer.Sound('assets/sounds/click_04.wav')
-    click_04_sound.set_volume(0.7 * sfx_volume)  # Slightly louder for button clicks
-else:
-    print("Warning: click_04.wav not found. Random name button click sound will not play.")
-if os.path.exists('assets/sounds/start_game.wav'):
-    start_game_sound = pygame.mixer.Sound('assets/sounds/start_game.wav')
-    start_game_sound.set_volume(0.8 * sfx_volume)  # Slightly louder for game start
-else:
-    print("Warning: start_game.wav not found. Start game button sound will not play.")
-
-# Start the music if file exists
-if os.path.exists(main_theme_path):
-    pygame.mixer.music.load(main_theme_path)
-    pygame.mixer.music.set_volume(music_volume)
-    pygame.mixer.music.play(-1)  # Loop indefinitely
-else:
-    print(f"Warning: {main_theme_path} not found. Music will not play.")
+clock = bootstrap.run_once("clock", pygame.time.Clock)
+
+# Start the music (assets are loaded lazily through the asset manager)
+assets.set_sfx_volume(sfx_volume)
+bootstrap.run_once("mixer.music.load", assets.play_music, 'main_theme', music_volume)
 
 # Font sizes (will be scaled based on resolution)
 TITLE_SIZE = 64
@@ -135,16 +74,17 @@ BUTTON_SIZE = 36
 TEXT_SIZE = 28
 INPUT_SIZE = 32
 
-# Fonts - these will be recreated when resolution changes
-title_font = pygame.font.Font(None, TITLE_SIZE)
-button_font = pygame.font.Font(None, BUTTON_SIZE)
-text_font = pygame.font.Font(None, TEXT_SIZE)
-input_font = pygame.font.Font(None, INPUT_SIZE)
+# Fonts - these are swapped for registry fonts when resolution changes
+title_font = get_font(None, TITLE_SIZE)
+button_font = get_font(None, BUTTON_SIZE)
+text_font = get_font(None, TEXT_SIZE)
+input_font = get_font(None, INPUT_SIZE)
+logo_title_font = get_font(None, title_font.get_height() * 3)  # Big "fishgame." title on the start screen
 
 # Scale fonts for initial screen size
 def scale_fonts(width, height):
     """Scale font sizes based on screen resolution"""
-    global title_font, button_font, text_font, input_font
+    global title_font, button_font, text_font, input_font, logo_title_font
     
     # Calculate scale factor (using the smaller dimension)
     scale_factor = min(width / DEFAULT_WIDTH, height / DEFAULT_HEIGHT)
@@ -155,99 +95,25 @@ def scale_fonts(width, height):
     text_size = max(14, int(TEXT_SIZE * scale_factor))
     input_size = max(16, int(INPUT_SIZE * scale_factor))
     
-    # Create new fonts with scaled sizes
-    title_font = pygame.font.Font(None, title_size)
-    button_font = pygame.font.Font(None, button_size)
-    text_font = pygame.font.Font(None, text_size)
-    input_font = pygame.font.Font(None, input_size)
+    old_fonts = (title_font, button_font, text_font, input_font, logo_title_font)
+    
+    # Fetch fonts with scaled sizes (only built the first time a size is seen)
+    title_font = get_font(None, title_size)
+    button_font = get_font(None, button_size)
+    text_font = get_font(None, text_size)
+    input_font = get_font(None, input_size)
+    
+    # Precompute the start screen title font so draw doesn't build one every frame
+    logo_title_font = get_font(None, title_font.get_height() * 3)
+    
+    # Cached text and static layers were rendered with the old fonts
+    if (title_font, button_font, text_font, input_font, logo_title_font) != old_fonts:
+        text_cache.clear()
+        invalidate_layers()
 
 # Initialize fonts for the current screen size
-scale_fonts(current_width, current_height)
-
-class AnimatedGIF:
-    def __init__(self, gif_path, scale_factor=1.0):
-        self.frames = []
-        self.current_frame = 0
-        self.frame_delay = 0
-        self.last_update_time = 0
-        self.scale_factor = scale_factor
-        self.load_gif(gif_path)
-        
-    def load_gif(self, gif_path):
-        """Load frames from a GIF file"""
-        if not os.path.exists(gif_path):
-            print(f"Warning: GIF file not found: {gif_path}")
-            return
-            
-        try:
-            # Open the GIF file
-            gif = Image.open(gif_path)
-            
-            # Get all frames
-            for frame in ImageSequence.Iterator(gif):
-                # Convert frame to RGBA mode (for transparency)
-                frame_rgba = frame.convert("RGBA")
-                
-                # Scale the frame if needed
-                if self.scale_factor != 1.0:
-                    new_size = (
-                        int(frame_rgba.width * self.scale_factor), 
-                        int(frame_rgba.height * self.scale_factor)
-                    )
-                    frame_rgba = frame_rgba.resize(new_size, Resampling.LANCZOS)
-                
-                # Convert PIL image to pygame surface
-                frame_data = frame_rgba.tobytes()
-                frame_size = frame_rgba.size
-                pygame_frame = pygame.image.fromstring(
-                    frame_data, frame_size, "RGBA"
-                )
-                
-                # Store the frame
-                self.frames.append(pygame_frame)
-                
-            # Get the frame delay time (in milliseconds)
-            # Default to 100ms if not specified
-            self.frame_delay = gif.info.get('duration', 100)
-            
-            # Initialize the last update time
-            self.last_update_time = pygame.time.get_ticks()
-            
-            print(f"Successfully loaded GIF with {len(self.frames)} frames")
-            
-        except Exception as e:
-            print(f"Error loading GIF: {e}")
-            
-    def update(self):
-        """Update the animation frame"""
-        if not self.frames:
-            return
-            
-        current_time = pygame.time.get_ticks()
-        
-        # Check if it's time to advance to the next frame
-        if current_time - self.last_update_time > self.frame_delay:
-            self.current_frame = (self.current_frame + 1) % len(self.frames)
-            self.last_update_time = current_time
-            
-    def draw(self, surface, position):
-        """Draw the current frame at the specified position"""
-        if not self.frames:
-            return
-            
-        # Center the frame horizontally
-        frame = self.frames[self.current_frame]
-        x = position[0] - frame.get_width() // 2
-        y = position[1]
-        
-        # Draw the frame
-        surface.blit(frame, (x, y))
-        
-    def get_size(self):
-        """Get the size of the current frame"""
-        if not self.frames:
-            return (0, 0)
-        return self.frames[self.current_frame].get_size()
+with bootstrap.timed("scale_fonts"):
+    scale_fonts(current_width, current_height)
 
 # First and last name lists from main.py
 first_names = [
@@ -267,10 +133,34 @@ last_names = [
     "Lighthouse", "Portside", "Starboard", "Windward", "Leeward", "Offshore","Cthulu","Jackson","Texas", "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Martinez", "Davis", "Rodriguez", "Wilson", "Anderson", "Thomas", "Moore", "Martin", "Lee", "Perez", "Big Back", "Buster", "Military", "Taylor", "Chimichanga"
 ]
 
+# Session RNG for names and bubbles, seeded so recorded sessions replay the same
+session_rng = random.Random()
+
+def seed_rng(seed=None):
+    """Seed the session RNG (a random seed if None), returns the seed"""
+    if seed is None:
+        seed = random.getrandbits(64)
+    session_rng.seed(seed)
+    return seed
+
+def window_state():
+    """Return the window state a session starts from (width, height, max width, max height, maximized)"""
+    return (current_width, current_height, MAX_WIDTH, MAX_HEIGHT, maximized)
+
+def restore_window_state(width, height, max_width, max_height, is_maximized):
+    """Put the window back into a recorded state (for replays)"""
+    global screen, current_width, current_height, MAX_WIDTH, MAX_HEIGHT, maximized
+    current_width, current_height = width, height
+    MAX_WIDTH, MAX_HEIGHT = max_width, max_height
+    maximized = is_maximized
+    screen = pygame.display.set_mode((current_width, current_height), pygame.RESIZABLE)
+    scale_fonts(current_width, current_height)
+    invalidate_layers()
+
 def generate_random_name():
     """Generate a random fish-themed name using first and last name components"""
-    first = random.choice(first_names)
-    last = random.choice(last_names)
+    first = session_rng.choice(first_names)
+    last = session_rng.choice(last_names)
     return f"{first} {last}"
 
 def toggle_maximized():
@@ -291,6 +181,9 @@ def toggle_maximized():
     # Update the maximized flag
     maximized = not maximized
     
+    # Static layers have to be rebuilt at the new size
+    invalidate_layers()
+    
     # Scale fonts for new resolution
     scale_fonts(current_width, current_height)
 
@@ -306,14 +199,7 @@ def set_sfx_volume(volume):
     sfx_volume = max(0.0, min(1.0, volume))  # Clamp between 0 and 1
     
     # Update all sound effect volumes
-    if pop_drip_sound:
-        pop_drip_sound.set_volume(0.5 * sfx_volume)
-    if digi_plink_sound:
-        digi_plink_sound.set_volume(0.5 * sfx_volume)
-    if click_04_sound:
-        click_04_sound.set_volume(0.7 * sfx_volume)
-    if start_game_sound:
-        start_game_sound.set_volume(0.7 * sfx_volume)
+    assets.set_sfx_volume(sfx_volume)
 
 class Button:
     def __init__(self, x_percent, y_percent, width_percent, height_percent, text, color, hover_color, action=None):
@@ -348,7 +234,7 @@ class Button:
         pygame.draw.rect(surface, BLACK, self.rect, 2)  # Border
         
         # Draw text
-        text_surf = button_font.render(self.text, True, BLACK)
+        text_surf = render_text(button_font, self.text, True, BLACK)
         text_rect = text_surf.get_rect(center=self.rect.center)
         surface.blit(text_surf, text_rect)
         
@@ -358,8 +244,8 @@ class Button:
         self.is_hovered = self.rect.collidepoint(mouse_pos)
         
         # Play hover sound when mouse enters button (not when leaving)
-        if self.is_hovered and not self.was_hovered and digi_plink_sound:
-            digi_plink_sound.play()
+        if self.is_hovered and not self.was_hovered:
+            assets.play_sound('digi_plink')
         
         return self.is_hovered
         
@@ -440,7 +326,7 @@ class Slider:
         )
         
         # Draw label
-        label_text = text_font.render(f"{self.label}: {int(self.value * 100)}%", True, WHITE)
+        label_text = render_text(text_font, f"{self.label}: {int(self.value * 100)}%", True, WHITE)
         surface.blit(label_text, (self.rect.x, self.rect.y - label_text.get_height() - 5))
         
     def check_hover(self, mouse_pos):
@@ -460,8 +346,8 @@ class Slider:
         is_currently_hovered = handle_rect.collidepoint(mouse_pos)
         
         # Play hover sound when mouse enters slider handle
-        if is_currently_hovered and not self.was_hovered and digi_plink_sound:
-            digi_plink_sound.play()
+        if is_currently_hovered and not self.was_hovered:
+            assets.play_sound('digi_plink')
         
         # Update hover state
         self.was_hovered = is_currently_hovered
@@ -564,7 +450,7 @@ class InputBox:
         pygame.draw.rect(surface, BLACK, self.rect, 2)  # Border
         
         # Render and center the text
-        text_surf = input_font.render(self.text, True, BLACK)
+        text_surf = render_text(input_font, self.text, True, BLACK)
         
         # Create a temporary rect for text positioning
         text_rect = text_surf.get_rect()
@@ -583,13 +469,22 @@ class InputBox:
                             (cursor_x, cursor_y + 10), 2)
 
 class StartScreen:
-    def __init__(self):
+    def __init__(self, input_source=None):
+        # Input comes from the real devices unless a scripted source is given
+        self.input = input_source if input_source is not None else LiveInput()
+        
+        # Set when the player quits from inside the game
+        self.quit_requested = False
+        
+        # Final state of every game played from this menu (part of state_digest)
+        self.game_digest = hashlib.sha1()
+        
         self.current_name = generate_random_name()
         self.custom_input = ""  # Track custom user input
         self.use_custom_name = False  # Flag to track which name to use
         
-        # Load the animated GIF
-        self.logo_animation = AnimatedGIF('assets/animations/mainmenu.gif', scale_factor=10.0)
+        # Animated logo (native resolution, decoded on a worker thread so the menu shows immediately)
+        self.logo_animation = assets.acquire('main_menu')
         
         # Create input box (x%, y%, width%, height%)
         self.input_box = InputBox(0.5 - 0.1875, 0.52, 0.4, 0.1, "")
@@ -624,8 +519,11 @@ class StartScreen:
             sfx_volume, "SFX Volume"  # initial value and label
     )
         
+        # Static text (title, name prompt, controls hint) rendered once into a layer
+        self.static_text = StaticBlits(self.static_text_blits)
+        
         # Background elements
-        self.bubbles = []
+        self.bubble_sprites = BubbleSpriteCache()
         self.initialize_bubbles()
         
         # Toggle flag for name source
@@ -633,22 +531,9 @@ class StartScreen:
         
     def initialize_bubbles(self):
         """Create bubbles scaled to screen size with physics properties"""
-        self.bubbles = []
         bubble_count = int(30 * (current_width * current_height) / (DEFAULT_WIDTH * DEFAULT_HEIGHT))
-        
-        for _ in range(bubble_count):
-            self.bubbles.append({
-                'x': random.randint(0, current_width),
-                'y': random.randint(0, current_height),
-                'size': random.randint(8, 25),
-                'speed': random.uniform(0.3, 1.5),
-                'vel_x': 0.0,  # Horizontal velocity for cursor interaction
-                'vel_y': 0.0,  # Vertical velocity for cursor interaction
-                'original_speed': random.uniform(0.3, 1.5),  # Store original upward speed
-                'alpha': random.randint(80, 150),  # Individual transparency
-                'wobble': random.uniform(0, 6.28),  # For slight horizontal wobble
-                'wobble_speed': random.uniform(0.02, 0.05)
-            })
+        self.bubbles = BubbleField(bubble_count, current_width, current_height,
+                                   np.random.default_rng(session_rng.getrandbits(64)))
     
     def update_ui_elements(self):
         """Update UI elements after resolution change"""
@@ -660,15 +545,13 @@ class StartScreen:
         self.initialize_bubbles()
         
     def regenerate_name(self):
-        if click_04_sound:
-            click_04_sound.play()
+        assets.play_sound('click_04')
         self.current_name = generate_random_name()
         self.using_random_name = True
         
     def start_game(self):
         # Play the start game sound
-        if start_game_sound:
-            start_game_sound.play()
+        assets.play_sound('start_game')
         
         # Determine which name to use
         player_name = self.current_name if self.using_random_name else self.input_box.text
@@ -683,71 +566,24 @@ class StartScreen:
         try:
             # First check if the game module exists
             import game
-            # Run the game
-            game.run_game(player_name)
-            # When game.py returns, we'll be back in the main menu
+            # Run the game, when it returns we'll be back in the main menu
+            if not game.run_game(player_name, input_source=self.input, window=window_state(), digest=self.game_digest):
+                # Player quit from inside the game
+                self.quit_requested = True
+            
+            # The menu frame that launched the game spans the whole session, don't record it
+            frame_stats.cancel_frame()
         except ImportError as e:
             print(f"Error loading game module: {e}")
             print("Make sure game.py exists in the same directory as start_screen.py")
         
     def update(self):
         # Get mouse position for cursor interaction
-        mouse_x, mouse_y = pygame.mouse.get_pos()
+        mouse_x, mouse_y = self.input.mouse_pos
         
-        # Track if any bubble was affected for sound playing
-        bubble_affected = False
-
-        # Update bubble positions with cursor interaction
-        for bubble in self.bubbles:
-            # Calculate distance from cursor to bubble
-            dx = bubble['x'] - mouse_x
-            dy = bubble['y'] - mouse_y
-            distance = (dx * dx + dy * dy) ** 0.5
-            
-            # Interaction radius based on bubble size
-            interaction_radius = bubble['size'] * 3
-            
-            if distance < interaction_radius and distance > 0:
-                # Calculate repulsion force (bubbles move away from cursor)
-                force_strength = (interaction_radius - distance) / interaction_radius
-                force_strength = min(force_strength * 8, 15)  # Limit max force
-                
-                # Normalize direction vector
-                dx_norm = dx / distance
-                dy_norm = dy / distance
-                
-                # Apply force
-                bubble['vel_x'] += dx_norm * force_strength * 0.3
-                bubble['vel_y'] += dy_norm * force_strength * 0.3
-
-                    # Mark that a bubble was affected if force is significant
-                if force_strength > 2:
-                    bubble_affected = True
-            
-            # Apply some damping to velocities
-            bubble['vel_x'] *= 0.95
-            bubble['vel_y'] *= 0.95
-            
-            # Add slight horizontal wobble for natural movement
-            bubble['wobble'] += bubble['wobble_speed']
-            wobble_offset = math.sin(bubble['wobble']) * 0.5
-            
-            # Update position with original upward movement + interaction forces + wobble
-            bubble['x'] += bubble['vel_x'] + wobble_offset
-            bubble['y'] += bubble['vel_y'] - bubble['original_speed']
-            
-            # Keep bubbles on screen horizontally
-            if bubble['x'] < -bubble['size']:
-                bubble['x'] = current_width + bubble['size']
-            elif bubble['x'] > current_width + bubble['size']:
-                bubble['x'] = -bubble['size']
-                
-            # Reset bubble when it goes off top
-            if bubble['y'] < -bubble['size']:
-                bubble['y'] = current_height + bubble['size']
-                bubble['x'] = random.randint(0, current_width)
-                bubble['vel_x'] = 0
-                bubble['vel_y'] = 0
+        # Update all bubble positions with cursor interaction in one batched step
+        with frame_stats.section('bubbles.update'):
+            bubble_affected = self.bubbles.update(mouse_x, mouse_y, current_width, current_height)
                 
         # Play bubble sound if any bubble was significantly affected
         # Add a cooldown to prevent sound spam
@@ -755,15 +591,18 @@ class StartScreen:
         if not hasattr(self, 'last_bubble_sound_time'):
             self.last_bubble_sound_time = 0
         
-        if bubble_affected and pop_drip_sound and (current_time - self.last_bubble_sound_time > 150):
-            pop_drip_sound.play()
+        if bubble_affected and (current_time - self.last_bubble_sound_time > 150):
+            assets.play_sound('pop_drip')
             self.last_bubble_sound_time = current_time
 
         # Update the GIF animation
-        self.logo_animation.update()
+        if self.logo_animation:
+            self.logo_animation.update()
         
     def handle_events(self):
-        mouse_pos = pygame.mouse.get_pos()
+        # Read this frame's events and mouse position
+        events = self.input.poll()
+        mouse_pos = self.input.mouse_pos
         
         # Check button hover states
         self.regenerate_button.check_hover(mouse_pos)
@@ -771,7 +610,7 @@ class StartScreen:
         self.music_slider.check_hover(mouse_pos)
         self.sfx_slider.check_hover(mouse_pos)
         
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 return False
                 
@@ -783,6 +622,12 @@ class StartScreen:
                     # F11 toggles between maximized and normal window
                     toggle_maximized()
                     self.update_ui_elements()
+                elif event.key == pygame.K_F3:
+                    # F3 shows or hides the frame-time overlay
+                    stats_overlay.toggle()
+                elif event.key == pygame.K_F4:
+                    # F4 exports the recorded frame times (CSV and JSON)
+                    frame_stats.export()
 
             
             # Handle window resize events
@@ -791,6 +636,7 @@ class StartScreen:
                 current_width, current_height = event.size
                 screen = pygame.display.set_mode((current_width, current_height), pygame.RESIZABLE)
                 scale_fonts(current_width, current_height)
+                invalidate_layers()
                 self.update_ui_elements()
             
             # Handle volume slider events
@@ -816,77 +662,41 @@ class StartScreen:
             if self.start_button.handle_event(event):
                 pass  # Action is handled by the button
                 
-        return True
+        # Keep running unless the player quit from inside the game
+        return not self.quit_requested
               
     def draw(self):
         # Fill background
         screen.fill((20, 60, 100))  # Deep blue background
         
         # Draw bubbles with enhanced visuals
-        mouse_x, mouse_y = pygame.mouse.get_pos()
-        
-        for bubble in self.bubbles:
-            # Calculate distance from cursor for visual effects
-            dx = bubble['x'] - mouse_x
-            dy = bubble['y'] - mouse_y
-            distance = (dx * dx + dy * dy) ** 0.5
-            interaction_radius = bubble['size'] * 3
-            
-            # Change bubble appearance based on cursor proximity
-            if distance < interaction_radius:
-                # Bubble is near cursor - make it brighter and more opaque
-                proximity_factor = 1 - (distance / interaction_radius)
-                alpha = min(255, int(bubble['alpha'] + proximity_factor * 100))
-                color = (
-                    min(255, int(200 + proximity_factor * 55)),
-                    min(255, int(220 + proximity_factor * 35)),
-                    255
-                )
-            else:
-                # Normal bubble appearance
-                alpha = bubble['alpha']
-                color = (200, 220, 255)
-            
-            # Create a surface for the bubble with transparency
-            bubble_surface = pygame.Surface((bubble['size'] * 2, bubble['size'] * 2), pygame.SRCALPHA)
-            
-            # Draw outer bubble (main bubble)
-            pygame.draw.circle(
-                bubble_surface,
-                (*color, alpha),
-                (bubble['size'], bubble['size']),
-                bubble['size']
-            )
-            
-            # Draw inner highlight for 3D effect
-            highlight_size = max(2, bubble['size'] // 3)
-            highlight_offset = bubble['size'] // 4
-            pygame.draw.circle(
-                bubble_surface,
-                (255, 255, 255, min(100, alpha // 2)),
-                (bubble['size'] - highlight_offset, bubble['size'] - highlight_offset),
-                highlight_size
-            )
+        mouse_x, mouse_y = self.input.mouse_pos
+        
+        with frame_stats.section('bubbles.draw'):
+            # Cursor proximity from the spatial grid, near bubbles get brighter and more opaque
+            near, proximity = self.bubbles.proximity(mouse_x, mouse_y)
             
-            # Blit the bubble surface to the screen
-            screen.blit(
-                bubble_surface,
-                (int(bubble['x'] - bubble['size']), int(bubble['y'] - bubble['size']))
-            )
+            # Blit pre-rendered bubble sprites instead of drawing new surfaces every frame
+            self.bubble_sprites.draw(screen, self.bubbles, near, proximity)
         
         # Draw animated logo above title
         logo_y = int(current_height * 0.03)  # Position above the title
-        self.logo_animation.draw(screen, (current_width // 2, logo_y))
+        logo_height = int(current_height * 0.24)  # Fill the space between the top and the title
+        if self.logo_animation:
+            with frame_stats.section('logo.draw'):
+                self.logo_animation.draw(screen, (current_width // 2, logo_y), height=logo_height)
+        
+        # Draw title, name prompt and controls hint from their cached surfaces
+        self.static_text.draw(screen)
         
-        # Draw title
-        scaled_title_font = pygame.font.Font(None, int(title_font.get_height() * 3))  # 50% bigger
-        title_text = scaled_title_font.render("fishgame.", True, WHITE)
-        screen.blit(title_text, (current_width // 2 - title_text.get_width() // 2, int(current_height * 0.27)))
+        with frame_stats.section('widgets.draw'):
+            self.draw_widgets()
         
-        # Draw character name prompt
-        prompt_text = text_font.render("Your name:", True, WHITE)
-        screen.blit(prompt_text, (current_width // 2 - prompt_text.get_width() // 2, int(current_height * 0.47)))
+        # Frame-time overlay (F3) on top of everything
+        stats_overlay.draw(screen, frame_stats)
         
+    def draw_widgets(self):
+        """Draw the name box, buttons and volume sliders"""
         # Draw input box or current random name based on mode
         if self.using_random_name:
             # Draw character name box for random name
@@ -900,11 +710,11 @@ class StartScreen:
             pygame.draw.rect(screen, BLACK, name_box_rect, 2)
             
             # Draw random name
-            name_text = button_font.render(self.current_name, True, BLACK)
+            name_text = render_text(button_font, self.current_name, True, BLACK)
             screen.blit(name_text, (current_width // 2 - name_text.get_width() // 2, int(current_height * 0.53 + name_text.get_height() * 0.5)))
             
             # Draw click to edit hint
-            hint_text = text_font.render("(Click to edit)", True, WHITE)
+            hint_text = render_text(text_font, "(Click to edit)", True, WHITE)
             screen.blit(hint_text, (current_width // 2 - hint_text.get_width() // 2, int(current_height * 0.62)))
         else:
             # Draw the input box for custom name
@@ -918,9 +728,60 @@ class StartScreen:
         self.music_slider.draw(screen)
         self.sfx_slider.draw(screen)
         
-        # Draw controls info
-        controls_text = text_font.render("F11: Toggle size | ESC: Exit", True, WHITE)
-        screen.blit(controls_text, (current_width // 2 - controls_text.get_width() // 2, int(current_height * 0.92)))
+    def static_text_blits(self, size):
+        """Return the text that doesn't change between frames as (surface, position) pairs"""
+        width, height = size
+        
+        # Title
+        title_text = render_text(logo_title_font, "fishgame.", True, WHITE)
+        
+        # Character name prompt
+        prompt_text = render_text(text_font, "Your name:", True, WHITE)
+        
+        # Controls info
+        controls_text = render_text(text_font, "F11: Toggle size | ESC: Exit", True, WHITE)
+        
+        return [
+            (title_text, (width // 2 - title_text.get_width() // 2, int(height * 0.27))),
+            (prompt_text, (width // 2 - prompt_text.get_width() // 2, int(height * 0.47))),
+            (controls_text, (width // 2 - controls_text.get_width() // 2, int(height * 0.92)))
+        ]
+        
+    def state_digest(self):
+        """Hash of the session state (menu bubbles and names, and the final state of every game played)
+
+        A replay has to end with the recording's.
+        """
+        digest = hashlib.sha1(self.game_digest.digest())
+        field = self.bubbles
+        for array in (field.x, field.y, field.size, field.vel_x, field.vel_y, field.alpha, field.wobble):
+            digest.update(array.tobytes())
+        digest.update(self.current_name.encode('utf-8'))
+        digest.update(self.input_box.text.encode('utf-8'))
+        return digest.hexdigest()
+
+def menu_frame(start_screen, present=pygame.display.flip):
+    """Run one start screen frame (events, update, draw, present), returns False once the menu is closing
+    
+    The closing frame is still updated and drawn, main() and replays both go through here so a
+    replay ends in the same state as the recorded session.
+    """
+    # Handle events
+    running = start_screen.handle_events()
+    frame_stats.mark('events')
+    
+    # Update
+    start_screen.update()
+    frame_stats.mark('update')
+    
+    # Draw
+    start_screen.draw()
+    frame_stats.mark('draw')
+    
+    # Update display
+    present()
+    frame_stats.mark('flip')
+    return running
 
 def main():
     # Make sure Pillow is installed
@@ -932,30 +793,60 @@ def main():
         pygame.quit()
         sys.exit()
     
-    start_screen = StartScreen()
+    # Optional input recording for deterministic replays (--record-input or FISHGAME_RECORD_INPUT)
+    record_path = input_log_path()
+    input_source = None
+    if record_path:
+        seed = seed_rng()
+        input_source = RecordingInput(LiveInput(), record_path, seed, window_state())
+    
+    with bootstrap.timed("StartScreen.__init__"):
+        start_screen = StartScreen(input_source)
     running = True
     
+    # Show how long each startup stage took (and that none of them ran twice)
+    bootstrap.report()
+    
+    # Optional JSON startup trace (--startup-trace or FISHGAME_STARTUP_TRACE)
+    trace_path = bootstrap.startup_trace_path()
+    first_frame = True
+    
+    def first_flip():
+        """The first present ends the startup trace"""
+        with bootstrap.timed("first flip"):
+            pygame.display.flip()
+    
     while running:
-        # Handle events
-        running = start_screen.handle_events()
-        
-        # Update
-        start_screen.update()
-        
-        # Draw
-        start_screen.draw()
-        
-        # Update display
-        pygame.display.flip()
+        # Per-phase frame timing (F3 overlay, F4 export)
+        frame_stats.begin_frame('menu')
+        
+        running = menu_frame(start_screen, first_flip if first_frame else pygame.display.flip)
+        first_frame = False
+        
+        # Write the trace after the first presented frame, once the logo has finished loading in the background too
+        logo = start_screen.logo_animation
+        if trace_path and not (logo and logo.loading):
+            bootstrap.write_startup_trace(trace_path, {
+                'gif': logo.load_stats if logo else None,
+                'assets': assets.stats()
+            })
+            trace_path = None
         
         # Cap framerate
         clock.tick(FPS)
+        frame_stats.mark('tick')
+        frame_stats.end_frame()
     
-    # Cleanup
+    # Cleanup (the log ends with the final state, replays check they got there too)
+    if input_source:
+        input_source.close(start_screen.state_digest())
     pygame.mixer.music.stop()
     pygame.mixer.quit()
     pygame.quit()
     sys.exit()
 
 if __name__ == "__main__":
+    # game.py does "from start_screen import ...", make that find this module instead of
+    # importing (and initializing) start_screen a second time
+    sys.modules.setdefault("start_screen", sys.modules["__main__"])
     main()
\ No newline at end of file
@@ -0,0 +1,54 @@
+import time
+from collections import OrderedDict
+
+from frame_stats import frame_stats
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (font identity, text, antialias, color)"""
+    def __init__(self, max_entries=256):
+        self.entries = OrderedDict()
+        self.max_entries = max_entries
+
+        # Counters (renders == Font.render calls)
+        self.hits = 0
+        self.renders = 0
+
+    def render(self, font, text, antialias, color):
+        """Return a rendered text surface, calling Font.render only on a cache miss"""
+        key = (id(font), text, antialias, tuple(color))
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[1]
+
+        self.renders += 1
+        start_time = time.perf_counter()
+        surface = font.render(text, antialias, color)
+        frame_stats.add('text.render', time.perf_counter() - start_time)
+
+        # Keep a reference to the font so its id can't be reused while the entry lives
+        self.entries[key] = (font, surface)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return surface
+
+    def clear(self):
+        """Drop every cached surface (call when fonts are swapped)"""
+        self.entries.clear()
+
+    def stats(self):
+        """Return cache counters"""
+        return {'entries': len(self.entries), 'hits': self.hits, 'renders': self.renders}
+
+    def reset_stats(self):
+        """Reset hit/render counters"""
+        self.hits = 0
+        self.renders = 0
+
+# Shared cache used by every UI and HUD text call site
+text_cache = TextCache()
+
+def render_text(font, text, antialias, color):
+    """Render text through the shared cache"""
+    return text_cache.render(font, text, antialias, color)
@@ -0,0 +1,236 @@
+import atexit
+import multiprocessing
+import os
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+import pygame
+
+from entities import EntityStore
+from fish_school import FishSchool
+from lod import PopulationLOD
+from chunks import Camera
+
+# Simulate the fish in a worker process, the game loop only renders its snapshots (FISHGAME_WORLD_PROCESS=1)
+WORLD_PROCESS = os.environ.get("FISHGAME_WORLD_PROCESS") == "1"
+
+# Simulation rate of the worker (same as the game's fixed tick)
+TICK_RATE = 60
+TICK_TIME = 1.0 / TICK_RATE
+
+# Live fish a snapshot holds, LOD keeps far fewer alive (only the ones around the view)
+SNAPSHOT_CAPACITY = 65536
+
+# The worker idles when the render loop hasn't synced for this long (paused, back in the menu)
+IDLE_AFTER = 0.25
+
+# Per-fish columns in a snapshot
+SNAPSHOT_FIELDS = ('x', 'y', 'prev_x', 'prev_y', 'vel_x', 'vel_y')
+
+# Control block slots (float64) at the start of the shared memory
+LATEST = 0        # Snapshot buffer (0 or 1) holding the last completed tick
+TICK = 1          # Ticks published since the last reset
+PUBLISHED_AT = 2  # time.time() the latest snapshot was published
+GENERATION = 3    # Reset the latest snapshot belongs to
+PLAYER_X = 4      # Written by the render loop every frame
+PLAYER_Y = 5
+CAMERA_X = 6      # Top-left of the view in world pixels
+CAMERA_Y = 7
+HEARTBEAT = 8     # time.time() of the render loop's last sync
+COUNT = 9         # Live fish in the latest snapshot
+VIEW_WIDTH = 10
+VIEW_HEIGHT = 11
+CONTROL_SLOTS = 16
+
+def _map_shared(buffer, capacity):
+    """View a shared buffer as (control block, snapshot buffers[2, field, fish])"""
+    control = np.ndarray(CONTROL_SLOTS, dtype=np.float64, buffer=buffer)
+    snapshots = np.ndarray(
+        (2, len(SNAPSHOT_FIELDS), capacity), dtype=np.float64, buffer=buffer, offset=CONTROL_SLOTS * 8
+    )
+    return control, snapshots
+
+def _simulate(shared_name, capacity, lock, commands):
+    """Worker process: runs the fish population at TICK_RATE and publishes double-buffered snapshots
+
+    The whole population lives here under PopulationLOD around the render loop's camera
+    (spawning regions that come into range, folding fish that leave it, steering and moving the
+    near and mid tiers). Only the live fish are published, so a snapshot costs what's around the
+    view, not the population.
+    """
+    shared = shared_memory.SharedMemory(name=shared_name)
+    control, snapshots = _map_shared(shared.buf, capacity)
+
+    school = lod = camera = None
+    generation = 0
+    next_tick = time.perf_counter()
+
+    while True:
+        # Reset (new world) or stop commands, block while there's nothing to simulate
+        idle = school is None or time.time() - control[HEARTBEAT] > IDLE_AFTER
+        try:
+            command = commands.get(timeout=0.05) if idle else commands.get_nowait()
+        except queue.Empty:
+            command = False
+        if command is None:
+            break
+        if command:
+            population, width, height, seed, generation = command
+            school = FishSchool(EntityStore(), 0, width, height, np.random.default_rng(seed))
+            lod = PopulationLOD(school, width, height, population)
+            camera = Camera(0, 0, width, height)
+            next_tick = time.perf_counter()
+            continue
+        if idle:
+            next_tick = time.perf_counter()
+            continue
+
+        camera.x, camera.y = int(control[CAMERA_X]), int(control[CAMERA_Y])
+        camera.resize(int(control[VIEW_WIDTH]), int(control[VIEW_HEIGHT]))
+        lod.update(camera, control[PLAYER_X], control[PLAYER_Y])
+
+        # Fill the buffer the render loop isn't reading with the live fish, then flip
+        ids = school.ids[:capacity]
+        back = 1 - int(control[LATEST])
+        for field_index, field in enumerate(SNAPSHOT_FIELDS):
+            snapshots[back, field_index, :len(ids)] = getattr(school.store, field)[ids]
+        with lock:
+            control[LATEST] = back
+            control[COUNT] = len(ids)
+            control[TICK] += 1
+            control[PUBLISHED_AT] = time.time()
+            control[GENERATION] = generation
+
+        # Hold the tick rate, and don't try to catch up after a long stall
+        next_tick += TICK_TIME
+        delay = next_tick - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        elif delay < -0.25:
+            next_tick = time.perf_counter()
+
+    del control, snapshots
+    shared.close()
+
+class WorldProcess:
+    """Fish simulation in a worker process, read back through shared-memory snapshots
+
+    The worker owns the population and publishes each completed tick's live fish into one of
+    two snapshot buffers. The render loop sends it the player and camera, and only copies the
+    latest completed snapshot (under a lock held just for the buffer flip and the copy) into its
+    own school and draws from that.
+    """
+    def __init__(self, capacity=SNAPSHOT_CAPACITY):
+        self.capacity = capacity
+        self.generation = 0
+
+        size = CONTROL_SLOTS * 8 + 2 * len(SNAPSHOT_FIELDS) * capacity * 8
+        self.shared = shared_memory.SharedMemory(create=True, size=size)
+        self.control, self.snapshots = _map_shared(self.shared.buf, capacity)
+        self.control[:] = 0
+        self.control[GENERATION] = -1
+
+        # Forked so the worker never re-imports the main script (start_world_process forks before the display starts)
+        context = multiprocessing.get_context('fork')
+        self.lock = context.Lock()
+        self.commands = context.Queue()
+        self.process = context.Process(
+            target=_simulate, args=(self.shared.name, capacity, self.lock, self.commands), daemon=True
+        )
+        self.process.start()
+        atexit.register(self.close)
+
+    def reset(self, population, width, height, seed):
+        """Start a new world of population fish (spread over its regions, spawned around the camera)"""
+        self.generation += 1
+        self.control[HEARTBEAT] = time.time()
+        self.commands.put((population, width, height, seed, self.generation))
+
+    def sync(self, school, player_x, player_y, camera):
+        """Send the player and camera to the worker and copy the latest snapshot into school
+
+        The school is grown or shrunk to the snapshot's live fish. Positions are interpolated
+        between the snapshot's last two ticks by how long ago it was published, and written to
+        both x and prev_x so the usual draw path can be used as is. Returns False while the
+        worker hasn't published anything for the current world yet.
+        """
+        control = self.control
+        control[PLAYER_X] = player_x
+        control[PLAYER_Y] = player_y
+        control[CAMERA_X] = camera.x
+        control[CAMERA_Y] = camera.y
+        control[VIEW_WIDTH] = camera.view_width
+        control[VIEW_HEIGHT] = camera.view_height
+        control[HEARTBEAT] = time.time()
+
+        with self.lock:
+            if control[GENERATION] != self.generation:
+                return False
+            count = int(control[COUNT])
+            snapshot = self.snapshots[int(control[LATEST]), :, :count].copy()
+            published_at = control[PUBLISHED_AT]
+
+        # Fish spawned and folded in the worker, only how many are alive matters here
+        if count > len(school):
+            extra = count - len(school)
+            school.add(np.zeros(extra), np.zeros(extra))
+        elif count < len(school):
+            school.remove(school.ids[count:])
+        store = school.store
+        ids = school.ids
+
+        x, y, prev_x, prev_y, vel_x, vel_y = snapshot
+        interpolation = min(max((time.time() - published_at) / TICK_TIME, 0.0), 1.0)
+        store.x[ids] = store.prev_x[ids] = prev_x + (x - prev_x) * interpolation
+        store.y[ids] = store.prev_y[ids] = prev_y + (y - prev_y) * interpolation
+        store.vel_x[ids] = vel_x
+        store.vel_y[ids] = vel_y
+        return True
+
+    def close(self):
+        """Stop the worker and free the shared memory"""
+        if self.process is None:
+            return
+        self.commands.put(None)
+        self.process.join(timeout=1.0)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process = None
+        del self.control, self.snapshots
+        self.shared.close()
+        self.shared.unlink()
+
+# Worker shared by every game session (forked at startup)
+_world_process = None
+_unavailable_reason = "the worker is only started at launch, with FISHGAME_WORLD_PROCESS=1"
+_unavailable_reported = False
+
+def start_world_process():
+    """Fork the worker, call at startup before pygame.init() (returns the worker, or None if it can't run)
+
+    A 'spawn' worker would re-import the main script (start_screen.py), opening a second window
+    and starting the music again, so the worker is only ever forked. The fork has to happen
+    while this process is still single-threaded, before SDL, the mixer or the GIF decoder
+    thread have started.
+    """
+    global _world_process, _unavailable_reason
+    if _world_process is not None:
+        return _world_process
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        _unavailable_reason = "this platform can't fork processes"
+        return None
+    if pygame.display.get_init():
+        _unavailable_reason = "forking after the display has started is unsafe"
+        return None
+    _world_process = WorldProcess()
+    return _world_process
+
+def get_world_process():
+    """Return the worker forked at startup, or None if there isn't one (the reason is printed once)"""
+    global _unavailable_reported
+    if _world_process is None and not _unavailable_reported:
+        print(f"World process mode is not available: {_unavailable_reason}. Simulating the fish in the game loop instead.")
+        _unavailable_reported = True
+    return _world_process